@@ -0,0 +1,88 @@
+"""
+Накладні витрати MetricsMiddleware на запит: ASGI-застосунок з порожнім
+обробником викликається напряму (без мережі), запис метрик вимкнено.
+
+    python -m benchmarks.metrics_middleware
+"""
+
+import asyncio
+import json
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from middleware.metrics_middleware import MetricsMiddleware, set_metrics_label
+
+REQUESTS = 20_000
+BODY = json.dumps({"algorithm": "alt", "start_point": [50.45, 30.52]}).encode()
+
+
+async def endpoint(scope, receive, send):
+    await receive()
+    set_metrics_label("algorithm", "alt")
+    await Response(b"{}", media_type="application/json")(scope, receive, send)
+
+
+class PassThroughBaseMiddleware(BaseHTTPMiddleware):
+    """Порожній BaseHTTPMiddleware — попередня основа MetricsMiddleware"""
+
+    async def dispatch(self, request: Request, call_next):
+        await request.body()
+        return await call_next(request)
+
+
+def no_record(*args):
+    pass
+
+
+APPS = {
+    "no middleware": endpoint,
+    "MetricsMiddleware (ASGI)": MetricsMiddleware(endpoint, record=no_record),
+    "BaseHTTPMiddleware + body": PassThroughBaseMiddleware(endpoint),
+}
+
+
+async def run(app) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/shortest_path",
+        "raw_path": b"/shortest_path",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / REQUESTS
+
+
+def main():
+    print(f"{REQUESTS} requests per app")
+    baseline = None
+    for name, app in APPS.items():
+        seconds = min(asyncio.run(run(app)) for _ in range(3))
+        baseline = baseline if baseline is not None else seconds
+        print(
+            f"{name:<28}{seconds * 1e6:8.1f} us/request"
+            f"{(seconds - baseline) * 1e6:+8.1f} us overhead"
+        )
+
+
+if __name__ == "__main__":
+    main()
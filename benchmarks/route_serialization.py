@@ -0,0 +1,77 @@
+"""
+Порівняння часу серіалізації відповіді /shortest_path для маршруту
+з 50 000 вершин.
+
+    python -m benchmarks.route_serialization
+"""
+
+import json
+import timeit
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from utils.serialization import pack_route_buffer, unpack_route_buffer
+
+VERTICES = 50_000
+REPEAT = 20
+
+
+def make_response(vertices: int) -> dict:
+    rng = np.random.default_rng(0)
+    coords = np.cumsum(rng.normal(0, 1e-4, size=(vertices, 2)), axis=0)
+    coords += [49.0, 31.0]
+    return {
+        "route": coords.tolist(),
+        "distance": 612.34,
+        "duration_min": 431.5,
+        "route_id": "00000000-0000-0000-0000-000000000000",
+    }
+
+
+def default_json(content):
+    # Шлях FastAPI за замовчуванням: jsonable_encoder + JSONResponse.render
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+ENCODERS = {
+    "jsonable_encoder + json": default_json,
+    "orjson": orjson.dumps,
+    "msgpack": msgpack.packb,
+    "float32 buffer": lambda content: pack_route_buffer(content, "route"),
+}
+
+
+def float32_error(content) -> float:
+    """Найбільше відхилення координат після кодування у float32 (градуси)"""
+    decoded = unpack_route_buffer(pack_route_buffer(content, "route"), "route")
+    return float(np.abs(decoded["route"] - np.asarray(content["route"])).max())
+
+
+def main():
+    content = make_response(VERTICES)
+    print(f"{VERTICES} vertices, best of {REPEAT} runs")
+
+    baseline = None
+    for name, encode in ENCODERS.items():
+        size = len(encode(content))
+        seconds = min(timeit.repeat(lambda: encode(content), number=1, repeat=REPEAT))
+        baseline = baseline or seconds
+        print(
+            f"{name:<26}{seconds * 1000:9.2f} ms{size / 1024:10.0f} KiB"
+            f"{baseline / seconds:8.1f}x"
+        )
+
+    print(f"float32 buffer max coordinate error: {float32_error(content):.1e} deg")
+
+
+if __name__ == "__main__":
+    main()
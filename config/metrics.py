@@ -0,0 +1,12 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Метрики запитів пишуться в БД фоновою задачею пакетами: щонайбільше
+# METRICS_BATCH_SIZE рядків раз на METRICS_FLUSH_INTERVAL_MS
+METRICS_BATCH_SIZE = int(os.getenv("METRICS_BATCH_SIZE", 500))
+METRICS_FLUSH_INTERVAL_MS = int(os.getenv("METRICS_FLUSH_INTERVAL_MS", 1000))
+# Ліміт черги: якщо БД не встигає, нові метрики відкидаються (з лічильником)
+METRICS_QUEUE_MAX = int(os.getenv("METRICS_QUEUE_MAX", 50_000))
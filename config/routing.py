@@ -0,0 +1,40 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Кеш результатів пошуку маршрутів (ключ: алгоритм, вузли, загрози, версія графа)
+ROUTE_RESULT_CACHE_MAX_MB = int(os.getenv("ROUTE_RESULT_CACHE_MAX_MB", 256))
+ROUTE_RESULT_CACHE_TTL_SECONDS = int(os.getenv("ROUTE_RESULT_CACHE_TTL_SECONDS", 3600))
+
+# Окремі сегменти між сусідніми точками маршруту
+SEGMENT_CACHE_MAX_MB = int(os.getenv("SEGMENT_CACHE_MAX_MB", 128))
+SEGMENT_CACHE_TTL_SECONDS = int(os.getenv("SEGMENT_CACHE_TTL_SECONDS", 3600))
+
+# Маршрути, видані клієнту по route_id (для /save_route та завантаження файлу).
+# memory:// — у пам'яті процесу, redis://host:port/db — спільне для всіх воркерів
+ROUTE_STORE_URL = os.getenv("ROUTE_STORE_URL", "memory://")
+ROUTE_STORE_MAX_MB = int(os.getenv("ROUTE_STORE_MAX_MB", 256))
+ROUTE_STORE_TTL_SECONDS = int(os.getenv("ROUTE_STORE_TTL_SECONDS", 3600))
+
+# Розсилка змін загроз (скидання кешів, live-маршрути) між воркерами.
+# memory:// — лише в процесі, що змінив загрозу (тільки для одного воркера),
+# redis://host:port/db — через Redis pub/sub усім воркерам
+THREAT_EVENTS_URL = os.getenv("THREAT_EVENTS_URL", "memory://")
+
+# Кількість воркерів для паралельного пошуку сегментів маршруту (1 — без пулу)
+ROUTE_LEG_WORKERS = int(os.getenv("ROUTE_LEG_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Ліміт часу на оптимізацію порядку проміжних точок (optimize_order)
+WAYPOINT_ORDER_TIME_LIMIT_MS = int(os.getenv("WAYPOINT_ORDER_TIME_LIMIT_MS", 200))
+
+# Кеш областей досяжності (ключ: вузол, бюджет, загрози, версія графа)
+ISOCHRONE_CACHE_MAX_MB = int(os.getenv("ISOCHRONE_CACHE_MAX_MB", 64))
+ISOCHRONE_CACHE_TTL_SECONDS = int(os.getenv("ISOCHRONE_CACHE_TTL_SECONDS", 3600))
+
+# Радіус прив'язки вузлів графа до найближчого населеного пункту
+SETTLEMENT_RADIUS_KM = float(os.getenv("SETTLEMENT_RADIUS_KM", 10))
+
+# Крок вибірки точок уздовж ребер, довших за нього, для пошуку населених пунктів
+SETTLEMENT_SAMPLE_SPACING_M = float(os.getenv("SETTLEMENT_SAMPLE_SPACING_M", 500))
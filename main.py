@@ -3,21 +3,42 @@ import logging
 import osmnx as ox
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session
 
 from config.database import engine
+from config.routing import (
+    ROUTE_LEG_WORKERS,
+    SETTLEMENT_RADIUS_KM,
+    THREAT_EVENTS_URL,
+)
 from middleware.metrics_middleware import MetricsMiddleware
+from middleware.metrics_writer import METRICS_WRITER
 from routes.account import account
 from routes.admin import admin_router
+from routes.distance_matrix import distance_matrix_route
+from routes.isochrone import isochrone_route
+from routes.live_routing import live_routing_route
+from routes.places import places_route
 from routes.shortest_path import shortest_path_route
 from routes.threats_router import threats_router
-from utils.db_utils import load_settlements_from_geonames
+from utils.compact_graph import CompactGraph
+from utils.db_utils import load_valid_settlements
 from utils.landmark_utils import (
     get_regional_center_nodes,
+    landmark_distance_table,
     preprocess_landmarks_distances,
     select_global_landmarks,
 )
-from utils.utils import load_graph
+from utils.place_index import PlaceIndex
+from utils.route_legs import init_leg_pool, shutdown_leg_pool
+from utils.settlement_index import SettlementIndex, load_node_settlements
+from utils.threat_events import (
+    create_event_client,
+    start_threat_events,
+    stop_threat_events,
+)
+from utils.utils import add_travel_times, graph_version, load_graph
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -46,7 +67,8 @@ REGIONAL_CENTERS = [
 ]
 
 
-app = FastAPI(title="Graphmap Backend")
+# orjson замість стандартного json: значно швидше для великих списків координат
+app = FastAPI(title="Graphmap Backend", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +84,10 @@ app.add_middleware(MetricsMiddleware)
 ox.config(log_console=True, use_cache=True)
 
 app.include_router(shortest_path_route)
+app.include_router(distance_matrix_route)
+app.include_router(isochrone_route)
+app.include_router(live_routing_route)
+app.include_router(places_route)
 app.include_router(account)
 app.include_router(admin_router)
 app.include_router(threats_router)
@@ -70,14 +96,31 @@ app.include_router(threats_router)
 @app.on_event("startup")
 async def load_data_on_startup():
     app.state.graph = load_graph(graph_pickle_file, custom_filter)
+    app.state.graph_version = graph_version(app.state.graph)
+    add_travel_times(app.state.graph)
+    app.state.compact_graph = CompactGraph.from_graph(app.state.graph)
     print("Graph loaded and ready to use.")
 
+    # Таблиця settlements заповнюється окремо: python -m utils.settlement_import
+    app.state.settlement_index = SettlementIndex([], [], [])
+    app.state.place_index = PlaceIndex([])
     with Session(engine) as session:
         try:
-            load_settlements_from_geonames(session)
+            settlements = load_valid_settlements(session)
+            app.state.settlement_index = SettlementIndex.from_settlements(settlements)
+            print(f"Settlement index built: {len(app.state.settlement_index)} points.")
+            app.state.place_index = PlaceIndex(settlements)
         except Exception as e:
             print(f"Error loading settlements: {e}")
 
+    app.state.node_settlements = load_node_settlements(
+        f"{graph_pickle_file}_settlements.npz",
+        app.state.compact_graph,
+        app.state.settlement_index,
+        app.state.graph_version,
+        SETTLEMENT_RADIUS_KM,
+    )
+
     logger.info("Selecting landmarks...")
     city_names = [f"{city}, Ukraine" for city in REGIONAL_CENTERS]
     center_nodes = get_regional_center_nodes(app.state.graph, city_names)
@@ -87,8 +130,42 @@ async def load_data_on_startup():
     )
 
     logger.info("Preprocessing landmarks distances...")
-    app.state.landmark_distances = preprocess_landmarks_distances(
+    landmark_distances = preprocess_landmarks_distances(
         app.state.graph, app.state.landmarks
     )
+    app.state.landmark_table = landmark_distance_table(
+        app.state.compact_graph, app.state.landmarks, landmark_distances
+    )
 
     logger.info("Landmarks loaded and ready to use.")
+
+    init_leg_pool(
+        app.state.compact_graph,
+        app.state.landmark_table,
+        max_workers=ROUTE_LEG_WORKERS,
+    )
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    shutdown_leg_pool()
+
+
+@app.on_event("startup")
+def start_threat_event_subscriber():
+    start_threat_events(create_event_client(THREAT_EVENTS_URL))
+
+
+@app.on_event("shutdown")
+def stop_threat_event_subscriber():
+    stop_threat_events()
+
+
+@app.on_event("startup")
+async def start_metrics_writer():
+    METRICS_WRITER.start()
+
+
+@app.on_event("shutdown")
+async def flush_metrics():
+    await METRICS_WRITER.stop()
@@ -0,0 +1,206 @@
+import asyncio
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from config.database import engine
+from config.metrics import (
+    METRICS_BATCH_SIZE,
+    METRICS_FLUSH_INTERVAL_MS,
+    METRICS_QUEUE_MAX,
+)
+from models.endpoint_metrics import EndpointMetrics
+from models.request_metrics import RequestMetrics
+
+
+class MetricsWriter:
+    """
+    Буфер метрик запитів у пам'яті процесу. submit лише додає запис у чергу
+    (відповідь не чекає на БД); фонова задача раз на flush_interval або
+    щойно набралось batch_size записів пише їх пакетом: один bulk INSERT у
+    request_metrics і одне оновлення endpoint_metrics на кожну пару
+    (endpoint, algorithm) пакета. Якщо черга переповнена, нові записи
+    відкидаються і враховуються в dropped. stop дописує залишок черги.
+
+    Записи черги — кортежі (endpoint, method, response_time_ms, status_code,
+    algorithm, timestamp).
+    """
+
+    def __init__(self, engine, batch_size: int, flush_interval: float, max_queue: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+
+        self._queue = deque()
+        self._wake = None
+        self._task = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(
+        self,
+        endpoint: str,
+        method: str,
+        response_time_ms: float,
+        status_code: int,
+        algorithm: Optional[str] = None,
+    ):
+        """Метрики одного запиту (викликається з циклу подій, не блокує)"""
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+
+        self._queue.append(
+            (
+                endpoint,
+                method,
+                response_time_ms,
+                status_code,
+                algorithm,
+                datetime.utcnow(),
+            )
+        )
+        self.submitted += 1
+        if self._wake is not None and len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Зупиняє фонову задачу, дописавши все, що лишилось у черзі"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            while self._queue:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                await self._write(batch)
+
+            if self._stopping:
+                return
+
+    async def _write(self, batch):
+        try:
+            await run_in_threadpool(self._write_batch, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Error saving metrics: {e}")
+
+    def _write_batch(self, batch):
+        groups = {}
+        for record in batch:
+            endpoint, method, _, _, algorithm, _ = record
+            groups.setdefault((endpoint, algorithm), (method, []))[1].append(record)
+
+        with Session(self.engine) as session:
+            session.execute(
+                insert(RequestMetrics),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "endpoint": record[0],
+                        "method": record[1],
+                        "response_time_ms": record[2],
+                        "status_code": record[3],
+                        "timestamp": record[5],
+                    }
+                    for record in batch
+                ],
+            )
+            for (endpoint, algorithm), (method, records) in groups.items():
+                _merge_endpoint_metrics(session, endpoint, method, algorithm, records)
+            session.commit()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+def _merge_endpoint_metrics(session: Session, endpoint, method, algorithm, records):
+    """Додає пакет запитів одного ендпоінту до агрегованих метрик"""
+    times = [record[2] for record in records]
+    errors = sum(record[3] >= 400 for record in records)
+    first_at, last_at = records[0][5], records[-1][5]
+
+    stmt = (
+        select(EndpointMetrics)
+        .where(EndpointMetrics.endpoint == endpoint)
+        .where(EndpointMetrics.algorithm == algorithm)
+    )
+    metrics = session.exec(stmt).first()
+
+    if metrics is None:
+        metrics = EndpointMetrics(
+            endpoint=endpoint,
+            method=method,
+            algorithm=algorithm,
+            total_requests=0,
+            avg_response_time_ms=0.0,
+            min_response_time_ms=min(times),
+            max_response_time_ms=max(times),
+            error_count=0,
+            first_request_at=first_at,
+        )
+
+    total_requests = metrics.total_requests + len(times)
+    # Середній час — зважено по старих і нових запитах
+    metrics.avg_response_time_ms = (
+        metrics.avg_response_time_ms * metrics.total_requests + sum(times)
+    ) / total_requests
+    metrics.min_response_time_ms = min(metrics.min_response_time_ms, min(times))
+    metrics.max_response_time_ms = max(metrics.max_response_time_ms, max(times))
+    metrics.last_request_time_ms = times[-1]
+    metrics.error_count += errors
+    metrics.total_requests = total_requests
+    metrics.success_rate_percent = (
+        (total_requests - metrics.error_count) / total_requests * 100
+    )
+    metrics.last_request_at = last_at
+
+    session.add(metrics)
+
+
+METRICS_WRITER = MetricsWriter(
+    engine,
+    batch_size=METRICS_BATCH_SIZE,
+    flush_interval=METRICS_FLUSH_INTERVAL_MS / 1000,
+    max_queue=METRICS_QUEUE_MAX,
+)
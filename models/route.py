@@ -32,6 +32,14 @@ class Route(SQLModel, table=True):
         default=None, sa_column=Column(JSONB)
     )
 
+    # Результат перевірки на перетин з актуальними загрозами:
+    # clear, affected або recomputed
+    threat_status: Optional[str] = Field(default=None, index=True)
+    affected_threat_ids: Optional[List[str]] = Field(
+        default=None, sa_column=Column(JSONB)
+    )
+    threat_checked_at: Optional[datetime] = Field(default=None)
+
     # Point names
     start_point_name: Optional[str] = Field(default=None, index=True)
     end_point_name: Optional[str] = Field(default=None, index=True)
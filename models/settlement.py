@@ -1,3 +1,7 @@
+from typing import List, Optional
+
+from sqlalchemy import Column
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
 
 
@@ -11,3 +15,9 @@ class Settlement(SQLModel, table=True):
     lat: float
     lon: float
     country: str = "UA"
+
+    # Для пошуку місць: населення і альтернативні назви з GeoNames
+    population: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    alternate_names: Optional[List[str]] = Field(
+        default=None, sa_column=Column(JSONB)
+    )
@@ -1,11 +1,26 @@
 from datetime import datetime, timedelta
+from functools import partial
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
 from sqlmodel import func, select
 
-from config.database import SessionDep
+from config.database import SessionDep, engine
+from middleware.metrics_writer import METRICS_WRITER
 from models.endpoint_metrics import EndpointMetrics
 from models.request_metrics import RequestMetrics
+from routes.isochrone import ISOCHRONE_CACHE
+from routes.shortest_path import (
+    ROUTE_RESULT_CACHE,
+    ROUTE_STORE,
+    SEGMENT_CACHE,
+    recompute_saved_route,
+)
+from utils.route_validation import (
+    VALIDATION_JOBS,
+    new_validation_job,
+    revalidate_saved_routes,
+    running_validation_job,
+)
 
 admin_router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -184,3 +199,56 @@ def get_endpoints_summary(
             for ep in endpoints
         ],
     }
+
+
+@admin_router.get("/metrics/route-cache")
+def get_route_cache_metrics():
+    """Статистика кешів маршрутів: влучання, промахи, витіснення"""
+    return {
+        "route_results": ROUTE_RESULT_CACHE.stats(),
+        "segments": SEGMENT_CACHE.stats(),
+        "routes": ROUTE_STORE.stats(),
+        "isochrones": ISOCHRONE_CACHE.stats(),
+    }
+
+
+@admin_router.get("/metrics/writer")
+def get_metrics_writer_stats():
+    """Стан фонового запису метрик: черга, записані, відкинуті, помилки"""
+    return METRICS_WRITER.stats()
+
+
+@admin_router.post("/routes/revalidate", status_code=202)
+def revalidate_routes(
+    background_tasks: BackgroundTasks,
+    app: Request,
+    recompute: bool = False,
+    batch_size: int = Query(default=500, ge=10, le=5000),
+):
+    """
+    Фонова перевірка всіх збережених маршрутів на перетин з актуальними
+    загрозами; з recompute — ще й перерахування зачеплених маршрутів
+    """
+    if running_validation_job():
+        raise HTTPException(
+            status_code=409, detail="Route re-validation is already running"
+        )
+
+    job = new_validation_job(recompute)
+    background_tasks.add_task(
+        revalidate_saved_routes,
+        engine,
+        job,
+        partial(recompute_saved_route, app=app.app) if recompute else None,
+        batch_size,
+    )
+    return job
+
+
+@admin_router.get("/routes/revalidate/{job_id}")
+def get_revalidation_job(job_id: str):
+    """Прогрес фонової перевірки маршрутів"""
+    job = VALIDATION_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
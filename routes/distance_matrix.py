@@ -0,0 +1,54 @@
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request
+
+from schemas.distance_matrix_request import DistanceMatrixRequest
+from utils.distance_matrix import distance_matrix
+from utils.utils import threat_mask
+
+distance_matrix_route = APIRouter()
+
+
+def _matrix_values(matrix, scale, digits):
+    """Щільний масив для JSON: недосяжні пари — null"""
+    values = np.round(matrix / scale, digits).astype(object)
+    values[~np.isfinite(matrix)] = None
+    return values.tolist()
+
+
+@distance_matrix_route.post("/distance_matrix")
+def get_distance_matrix(request: DistanceMatrixRequest, app: Request):
+    """
+    Distances (km) and optionally durations (min) between every source and
+    target. All points are snapped at once and the threat mask is built once.
+    """
+    try:
+        compact_graph = app.app.state.compact_graph
+
+        targets = request.targets if request.targets is not None else request.sources
+        blocked_mask = threat_mask(compact_graph, request.threats)
+
+        points = request.sources + targets
+        indices = compact_graph.nearest_nodes(
+            [lat for lat, _ in points], [lon for _, lon in points], blocked_mask
+        )
+
+        distances, durations = distance_matrix(
+            compact_graph,
+            indices[: len(request.sources)],
+            indices[len(request.sources) :],
+            blocked_mask,
+            with_durations=request.durations,
+        )
+
+        response = {
+            "sources": len(request.sources),
+            "targets": len(targets),
+            "distances": _matrix_values(distances, 1000, 2),
+        }
+        if durations is not None:
+            response["durations_min"] = _matrix_values(durations, 60, 1)
+
+        return response
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from shapely.geometry import mapping, shape
+
+from config.routing import ISOCHRONE_CACHE_MAX_MB, ISOCHRONE_CACHE_TTL_SECONDS
+from schemas.isochrone_request import IsochroneRequest
+from utils.isochrone import reachable_area, reachable_costs
+from utils.route_cache import GeoBoundedCache, threats_hash
+from utils.threat_events import cache_invalidator, subscribe
+from utils.utils import threat_mask
+
+isochrone_route = APIRouter()
+
+# GeoJSON-геометрії смуг за (вузол, метрика, бюджет, ratio, загрози, версія графа)
+ISOCHRONE_CACHE = GeoBoundedCache(
+    max_bytes=ISOCHRONE_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=ISOCHRONE_CACHE_TTL_SECONDS,
+    geometry=lambda feature: shape(feature["geometry"]),
+)
+
+subscribe(cache_invalidator(ISOCHRONE_CACHE))
+
+# Одиниці бюджету в запиті -> метри / секунди
+BUDGET_SCALE = {"distance": 1000, "time": 60}
+
+
+@isochrone_route.post("/isochrone")
+def get_isochrone(request: IsochroneRequest, app: Request):
+    """
+    Areas reachable from a point within each band (km or minutes) while
+    avoiding threats, as a GeoJSON FeatureCollection of concave hulls.
+    """
+    try:
+        compact_graph = app.app.state.compact_graph
+        blocked_mask = threat_mask(compact_graph, request.threats)
+        lat, lon = request.point
+        source = int(compact_graph.nearest_nodes([lat], [lon], blocked_mask)[0])
+
+        key_prefix = (int(compact_graph.node_ids[source]), request.metric)
+        key_suffix = (
+            request.ratio,
+            threats_hash(request.threats),
+            app.app.state.graph_version,
+        )
+        bands = sorted(set(request.bands))
+        features = {
+            band: ISOCHRONE_CACHE.get((*key_prefix, band, *key_suffix))
+            for band in bands
+        }
+
+        # Один обмежений пошук на найбільшу з відсутніх у кеші смуг
+        missing = [band for band, feature in features.items() if feature is None]
+        if missing:
+            scale = BUDGET_SCALE[request.metric]
+            costs = reachable_costs(
+                compact_graph,
+                source,
+                max(missing) * scale,
+                blocked_mask,
+                request.metric,
+            )
+            for band in missing:
+                area, node_count = reachable_area(
+                    compact_graph, costs, band * scale, request.ratio
+                )
+                features[band] = {
+                    "type": "Feature",
+                    "properties": {
+                        "band": band,
+                        "metric": request.metric,
+                        "reachable_nodes": node_count,
+                    },
+                    "geometry": mapping(area),
+                }
+                ISOCHRONE_CACHE.put((*key_prefix, band, *key_suffix), features[band])
+
+        return ORJSONResponse(
+            {
+                "type": "FeatureCollection",
+                "origin": [
+                    float(compact_graph.ys[source]),
+                    float(compact_graph.xs[source]),
+                ],
+                # Від більшої смуги до меншої — зручно для накладання на карті
+                "features": [features[band] for band in reversed(bands)],
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from routes.shortest_path import duration_minutes, request_geometry_fields
+from schemas.live_route_request import LivePositionMessage, LiveRouteRequest
+from utils.live_routing import LIVE_ROUTES, LiveRouteSession
+from utils.threat_events import subscribe
+
+logger = logging.getLogger(__name__)
+
+live_routing_route = APIRouter()
+
+subscribe(LIVE_ROUTES.threat_changed)
+
+
+def route_message(session, request: LiveRouteRequest, found, reason, **extra):
+    if found is None:
+        return {
+            "type": "unreachable",
+            "session_id": session.id,
+            "reason": reason,
+            **extra,
+        }
+
+    summary = session.graph.route_summary(found[0])
+    return {
+        "type": "route",
+        "session_id": session.id,
+        "reason": reason,
+        **request_geometry_fields(request, summary["route_coords"]),
+        "distance": round(summary["total_distance"] / 1000, 2),
+        "duration_min": duration_minutes(summary["travel_time"]),
+        **extra,
+    }
+
+
+def error_message(status: int, detail):
+    return {"type": "error", "status": status, "detail": detail}
+
+
+async def receive_text(websocket: WebSocket) -> str:
+    """Текст наступного кадру клієнта; бінарний кадр — порожній рядок"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    return message.get("text") or ""
+
+
+def parse_client_message(text: str):
+    """
+    Повідомлення клієнта після початкового запиту: LivePositionMessage або
+    None для інших типів (ігноруються). Некоректне повідомлення — ValueError
+    з описом для кадру помилки.
+    """
+    try:
+        message = json.loads(text)
+    except ValueError:
+        raise ValueError("Message is not valid JSON")
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    if message.get("type") != "position":
+        return None
+
+    try:
+        return LivePositionMessage.model_validate(message)
+    except ValidationError as e:
+        raise ValueError(e.errors(include_url=False))
+
+
+def start_session(request: LiveRouteRequest, compact_graph, loop):
+    session = LiveRouteSession(
+        compact_graph, request.start_point, request.end_point, request.threats, loop
+    )
+    return session, session.route()
+
+
+@live_routing_route.websocket("/ws/live_route")
+async def live_route(websocket: WebSocket):
+    """
+    Live re-routing session. The first message is a LiveRouteRequest; then the
+    client may send {"type": "position", "point": [lat, lng]} as it moves.
+    The server pushes a route message initially, after each position update and
+    whenever a created/deleted threat changes this vehicle's best route.
+    """
+    await websocket.accept()
+
+    try:
+        # Некоректний JSON теж дає ValidationError (json_invalid)
+        request = LiveRouteRequest.model_validate_json(await receive_text(websocket))
+    except ValidationError as e:
+        await websocket.send_json(error_message(422, e.errors(include_url=False)))
+        await websocket.close(code=1008)
+        return
+    except WebSocketDisconnect:
+        return
+
+    # Помилка побудови сесії — кадр помилки і закриття, як для запиту
+    try:
+        session, found = await run_in_threadpool(
+            start_session,
+            request,
+            websocket.app.state.compact_graph,
+            asyncio.get_running_loop(),
+        )
+    except HTTPException as e:
+        await websocket.send_json(error_message(e.status_code, e.detail))
+        await websocket.close(code=1008)
+        return
+    except Exception:
+        logger.exception("Failed to start live route session")
+        await websocket.send_json(error_message(500, "Failed to build the route"))
+        await websocket.close(code=1011)
+        return
+    LIVE_ROUTES.register(session)
+
+    receive = asyncio.create_task(receive_text(websocket))
+    event = asyncio.create_task(session.events.get())
+    try:
+        await websocket.send_json(route_message(session, request, found, "initial"))
+
+        while True:
+            done, _ = await asyncio.wait(
+                {receive, event}, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if event in done:
+                action, threat_id, nodes = event.result()
+                event = asyncio.create_task(session.events.get())
+
+                # Незачеплені сесії лише запам'ятовують загрозу, без пошуку;
+                # клієнт отримує повідомлення, лише якщо шлях справді змінився
+                if await run_in_threadpool(
+                    session.apply_threat, action, threat_id, nodes
+                ):
+                    found, changed = await run_in_threadpool(session.reroute)
+                    if changed:
+                        await websocket.send_json(
+                            route_message(
+                                session,
+                                request,
+                                found,
+                                f"threat_{action}",
+                                threat_id=threat_id,
+                            )
+                        )
+
+            if receive in done:
+                text = receive.result()
+                receive = asyncio.create_task(receive_text(websocket))
+
+                # Некоректне повідомлення не завершує сесію — лише кадр помилки
+                try:
+                    message = parse_client_message(text)
+                except ValueError as e:
+                    await websocket.send_json(error_message(422, e.args[0]))
+                    continue
+
+                if message is not None:
+                    lat, lon = message.point
+                    found = await run_in_threadpool(session.move_to, lat, lon)
+                    await websocket.send_json(
+                        route_message(session, request, found, "position")
+                    )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        LIVE_ROUTES.unregister(session)
+        receive.cancel()
+        event.cancel()
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+
+places_route = APIRouter()
+
+
+def parse_bbox(bbox: str):
+    """«min_lon,min_lat,max_lon,max_lat» -> кортеж чисел"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat"
+        )
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox min values exceed max")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+@places_route.get("/places/search")
+def search_places(
+    app: Request,
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    bbox: str | None = None,
+):
+    """
+    Settlement autocomplete: matches Ukrainian or Latin spelling of any
+    known name, ranked by match quality, settlement type and population.
+    Places inside the optional bbox (min_lon,min_lat,max_lon,max_lat) rank higher.
+    """
+    bounds = parse_bbox(bbox) if bbox else None
+    places = app.app.state.place_index.search(q, limit, bounds)
+    return {"count": len(places), "places": places}
@@ -1,125 +1,328 @@
 import uuid
-from io import BytesIO
+from typing import Literal
 
-import networkx as nx
-import osmnx as ox
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import StreamingResponse
+import numpy as np
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlmodel import select
 
-from config.database import SessionDep
+from config.database import SessionDep, engine
+from config.routing import (
+    ROUTE_RESULT_CACHE_MAX_MB,
+    ROUTE_RESULT_CACHE_TTL_SECONDS,
+    ROUTE_STORE_MAX_MB,
+    ROUTE_STORE_TTL_SECONDS,
+    ROUTE_STORE_URL,
+    SEGMENT_CACHE_MAX_MB,
+    SEGMENT_CACHE_TTL_SECONDS,
+    SETTLEMENT_RADIUS_KM,
+    SETTLEMENT_SAMPLE_SPACING_M,
+    WAYPOINT_ORDER_TIME_LIMIT_MS,
+)
+from middleware.metrics_middleware import set_metrics_label
 from models.route import Route
 from models.user import User
 from routes.account import get_current_user
+from schemas.route_batch_request import RouteBatchRequest
 from schemas.route_request import RouteRequest
 from schemas.route_save import RouteSave
+from utils.alternatives import alternative_routes
+from utils.distance_matrix import distance_matrix
+from utils.polyline import format_geometry
+from utils.route_cache import GeoBoundedCache, route_cache_key, threats_hash
+from utils.route_export import (
+    SavedRoutes,
+    encode_chunks,
+    export_headers,
+    iter_export,
+    stored_route_export,
+)
+from utils.route_legs import iter_legs
+from utils.route_store import create_route_store
+from utils.serialization import route_response
+from utils.threat_events import cache_invalidator, subscribe
+from utils.tsp import optimize_visit_order
 from utils.utils import (
-    alt_heuristic,
-    build_route_file_content,
-    extract_edge_geometries,
-    filter_threats,
     get_settlements_along_route,
     plot_shortest_path,
+    snap_points,
+    threat_mask,
 )
 
 shortest_path_route = APIRouter()
 
-ROUTES_CACHE = {}
+# Обчислені маршрути, доступні клієнту по route_id (спільні для всіх воркерів,
+# якщо налаштовано Redis)
+ROUTE_STORE = create_route_store(
+    ROUTE_STORE_URL,
+    max_bytes=ROUTE_STORE_MAX_MB * 1024 * 1024,
+    ttl_seconds=ROUTE_STORE_TTL_SECONDS,
+)
+
+# Результати пошуку для повторних запитів з тими ж вузлами та загрозами
+ROUTE_RESULT_CACHE = GeoBoundedCache(
+    max_bytes=ROUTE_RESULT_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=ROUTE_RESULT_CACHE_TTL_SECONDS,
+    geometry=lambda result: result["route_coords"],
+)
+
+# Шляхи між сусідніми точками: при зміні однієї проміжної точки
+# перераховуються лише сегменти, що її торкаються
+SEGMENT_CACHE = GeoBoundedCache(
+    max_bytes=SEGMENT_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=SEGMENT_CACHE_TTL_SECONDS,
+)
+
+# Нова чи видалена загроза робить недійсними лише зачеплені нею записи
+subscribe(cache_invalidator(ROUTE_RESULT_CACHE, SEGMENT_CACHE))
+
+
+def route_points(request: RouteRequest):
+    return [request.start_point] + request.intermediate_points + [request.end_point]
 
 
 def prepare_graph_and_nodes(request: RouteRequest, app):
-    points = [request.start_point] + request.intermediate_points + [request.end_point]
+    points = route_points(request)
 
     G = app.state.graph  # G = load_graph(graphml_file, custom_filter)
+    compact_graph = app.state.compact_graph
 
-    if request.threats:
-        G = filter_threats(G, request.threats)
+    blocked_mask = threat_mask(compact_graph, request.threats)
 
-    nodes = [ox.nearest_nodes(G, lon, lat) for lat, lon in points]
-    return G, nodes, points
+    nodes = snap_points(compact_graph, points, blocked_mask)
+    return G, nodes, points, blocked_mask
 
 
-def build_full_route(G, nodes, points, path_func):
-    full_route = []
-    for i in range(len(nodes) - 1):
-        start_node, end_node = nodes[i], nodes[i + 1]
+def route_length(compact_graph, nodes, points, algorithm, blocked_mask, segment_key):
+    """Довжина (м) маршруту через nodes тим самим пошуком; inf — шляху немає"""
+    try:
+        edge_ids = build_full_route(
+            compact_graph, nodes, points, algorithm, blocked_mask, segment_key
+        )
+    except HTTPException:
+        return np.inf
+    return float(compact_graph.lengths[edge_ids].sum())
 
-        if not nx.has_path(G, start_node, end_node):
-            raise HTTPException(
-                status_code=404,
-                detail=f"Can't find path between {points[i]} and {points[i + 1]}.",
-            )
 
-        segment_path = path_func(G, start_node, end_node)
-        full_route.extend(segment_path[:-1])  # Avoid duplication
+def km_or_none(meters: float):
+    return round(meters / 1000, 2) if np.isfinite(meters) else None
 
-    full_route.append(nodes[-1])
-    return full_route
 
+def optimize_waypoint_order(request: RouteRequest, nodes, points, blocked_mask, app):
+    """
+    Переставляє проміжні точки (початок і кінець фіксовані) за матрицею
+    відстаней між усіма точками маршруту, обчисленою одним пакетом.
+    Повертає оновлені request, nodes, points і опис перестановки.
 
-def dijkstra_algorithm(G, u, v):
-    return nx.shortest_path(G, u, v, weight="length")
+    Матриця (Dijkstra) лише обирає порядок; відстані до і після рахуються
+    маршрутами, побудованими request.algorithm (ALT може бути неточним), —
+    сегменти потрапляють у SEGMENT_CACHE і не шукаються вдруге.
+    """
+    compact_graph = app.state.compact_graph
+    indices = compact_graph.node_indices(nodes)
+    distances, _ = distance_matrix(compact_graph, indices, indices, blocked_mask)
 
+    original_order = list(range(len(nodes)))
+    order = optimize_visit_order(distances, WAYPOINT_ORDER_TIME_LIMIT_MS / 1000)
 
-def alt_algorithm(G, u, v, landmarks, landmark_distances):
-    return nx.astar_path(
-        G,
-        u,
-        v,
-        weight="length",
-        heuristic=lambda u_, v_: alt_heuristic(u_, v_, landmarks, landmark_distances),
+    segment_key = segment_cache_key(request, app)
+    original_distance = route_length(
+        compact_graph, nodes, points, request.algorithm, blocked_mask, segment_key
     )
+    optimized_distance = original_distance
+    if order != original_order:
+        optimized_distance = route_length(
+            compact_graph,
+            [nodes[i] for i in order],
+            [points[i] for i in order],
+            request.algorithm,
+            blocked_mask,
+            segment_key,
+        )
 
+    if not optimized_distance < original_distance:
+        order, optimized_distance = original_order, original_distance
+
+    waypoint_order = [i - 1 for i in order[1:-1]]
+    update = {
+        "intermediate_points": [request.intermediate_points[i] for i in waypoint_order]
+    }
+    names = request.intermediate_point_names
+    if names and len(names) == len(waypoint_order):
+        update["intermediate_point_names"] = [names[i] for i in waypoint_order]
+
+    ordering = {
+        "waypoint_order": waypoint_order,
+        "original_distance": km_or_none(original_distance),
+        "optimized_distance": km_or_none(optimized_distance),
+    }
+    return (
+        request.model_copy(update=update),
+        [nodes[i] for i in order],
+        [points[i] for i in order],
+        ordering,
+    )
 
-@shortest_path_route.post("/shortest_path")
-def get_shortest_path(request: RouteRequest, app: Request):
-    try:
-        G, nodes, points = prepare_graph_and_nodes(request, app.app)
 
-        if request.algorithm == "dijkstra":
-            path_func = dijkstra_algorithm
+def prepare_route(request: RouteRequest, app):
+    """
+    Прив'язка точок до графа і маска загроз; з optimize_order — ще й
+    перестановка проміжних точок. Повертає (request, nodes, points,
+    blocked_mask, ordering), ordering — None без оптимізації.
+    """
+    G, nodes, points, blocked_mask = prepare_graph_and_nodes(request, app)
 
-        elif request.algorithm == "alt":
-            landmarks = app.app.state.landmarks
-            landmark_distances = app.app.state.landmark_distances
+    if not request.optimize_order or len(request.intermediate_points) < 2:
+        return request, nodes, points, blocked_mask, None
 
-            def path_func(G_, u_, v_):
-                return alt_algorithm(G_, u_, v_, landmarks, landmark_distances)
+    request, nodes, points, ordering = optimize_waypoint_order(
+        request, nodes, points, blocked_mask, app
+    )
+    return request, nodes, points, blocked_mask, ordering
 
-        full_route = build_full_route(G, nodes, points, path_func)
 
-        route_coords = extract_edge_geometries(G, full_route)
+def iter_route_segments(
+    compact_graph, nodes, points, algorithm, blocked_mask, segment_key=None
+):
+    """
+    Віддає id ребер сегментів між сусідніми точками по порядку. Відсутні в
+    SEGMENT_CACHE сегменти шукаються паралельно (utils.route_legs).
+    segment_key — (алгоритм, хеш загроз, версія графа).
+    """
+    indices = compact_graph.node_indices(nodes).tolist()
+    legs = list(zip(indices[:-1], indices[1:]))
+    cache_keys = [
+        (u, v, *segment_key) if segment_key else None
+        for u, v in zip(nodes[:-1], nodes[1:])
+    ]
+    cached = [SEGMENT_CACHE.get(key) if key else None for key in cache_keys]
+
+    missing = [legs[i] for i, segment in enumerate(cached) if segment is None]
+    solved = iter_legs(algorithm, missing, blocked_mask)
+
+    for i, segment_edges in enumerate(cached):
+        if segment_edges is None:
+            found = next(solved)
+
+            if found is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Can't find path between {points[i]} and {points[i + 1]}.",
+                )
+
+            segment_edges, _ = found
+            if cache_keys[i]:
+                SEGMENT_CACHE.put(
+                    cache_keys[i],
+                    segment_edges,
+                    compact_graph.path_geometry(segment_edges),
+                )
+
+        yield segment_edges
+
+
+def build_full_route(
+    compact_graph, nodes, points, algorithm, blocked_mask, segment_key=None
+):
+    """Id ребер усього маршруту (сегменти стикуються у спільних вузлах)"""
+    segments = list(
+        iter_route_segments(
+            compact_graph, nodes, points, algorithm, blocked_mask, segment_key
+        )
+    )
+    return np.concatenate(segments) if segments else np.empty(0, dtype=np.int64)
 
-        # Расчёт общей длины маршрута
-        total_distance = 0
-        for i in range(len(full_route) - 1):
-            u, v = full_route[i], full_route[i + 1]
-            edge_data = G.get_edge_data(u, v)
-            # В графе может быть несколько рёбер между узлами (мультиграф)
-            if isinstance(edge_data, dict):
-                if 0 in edge_data:
-                    total_distance += edge_data[0].get("length", 0)
-                else:
-                    # если это обычный граф, а не мультиграф
-                    total_distance += edge_data.get("length", 0)
 
-        # plot_shortest_path(
-        #     G,
-        #     full_route,
-        #     points,
-        #     request.start_point,
-        #     request.end_point,
-        #     intermediate_points=request.intermediate_points,  # Pass intermediate points
-        #     landmarks=app.app.state.landmarks,
-        #     threats=request.threats,  # Pass threats
-        # )
+def segment_cache_key(request: RouteRequest, app):
+    return (request.algorithm, threats_hash(request.threats), app.state.graph_version)
+
+
+def route_result(compact_graph, edge_ids, start_node):
+    """
+    Маршрут за ребрами, обраними пошуком: вузли, геометрія, довжина і час
+    рахуються одним проходом по масивах компактного графа
+    """
+    source = int(compact_graph.node_indices([start_node])[0])
+    return {
+        "full_route": compact_graph.path_nodes(edge_ids, source),
+        **compact_graph.route_summary(edge_ids),
+    }
+
+
+def compute_route(request: RouteRequest, nodes, points, blocked_mask, app):
+    compact_graph = app.state.compact_graph
+    edge_ids = build_full_route(
+        compact_graph,
+        nodes,
+        points,
+        request.algorithm,
+        blocked_mask,
+        segment_cache_key(request, app),
+    )
+    return route_result(compact_graph, edge_ids, nodes[0])
 
-        route_id = str(uuid.uuid4())
 
-        ROUTES_CACHE[route_id] = {
-            "full_route": full_route,
-            "route_coords": route_coords,
-            "total_distance": total_distance,
+def recompute_saved_route(route: Route, threats, app):
+    """
+    Перераховує збережений маршрут з актуальними загрозами. Повертає поля
+    для оновлення Route.
+    """
+    request = RouteRequest(
+        algorithm=route.algorithm,
+        start_point=route.start_point,
+        end_point=route.end_point,
+        intermediate_points=route.intermediate_points or [],
+        threats=threats,
+    )
+    request, nodes, points, blocked_mask, _ = prepare_route(request, app)
+    result = compute_route(request, nodes, points, blocked_mask, app)
+    return {
+        "total_distance": result["total_distance"],
+        "route_coords": result["route_coords"],
+        "full_route_nodes": result["full_route"],
+        "threats": threats,
+    }
+
+
+def geometry_fields(
+    coords, key, geometry_format="coords", tolerance=None, zoom=None, precision=5
+):
+    """Поле з геометрією маршруту в запитаному форматі (+ опис формату)"""
+    fields = {key: format_geometry(coords, geometry_format, tolerance, zoom, precision)}
+    if geometry_format != "coords":
+        fields["geometry_format"] = geometry_format
+        fields["precision"] = precision
+    return fields
+
+
+def request_geometry_fields(request: RouteRequest, coords, key="route"):
+    return geometry_fields(
+        coords,
+        key,
+        request.geometry_format,
+        request.tolerance,
+        request.zoom,
+        request.precision,
+    )
+
+
+def duration_minutes(travel_time):
+    return round(travel_time / 60, 1) if travel_time is not None else None
+
+
+def store_route(request: RouteRequest, result: dict) -> str:
+    """Зберігає обчислений маршрут у ROUTE_STORE і повертає його route_id"""
+    route_id = str(uuid.uuid4())
+
+    ROUTE_STORE.put(
+        route_id,
+        {
+            "full_route": result["full_route"],
+            "route_coords": result["route_coords"],
+            "total_distance": result["total_distance"],
+            "travel_time": result["travel_time"],
             "algorithm": request.algorithm,
             "start_point": request.start_point,
             "end_point": request.end_point,
@@ -128,15 +331,95 @@ def get_shortest_path(request: RouteRequest, app: Request):
             "start_point_name": request.start_point_name,
             "end_point_name": request.end_point_name,
             "intermediate_point_names": request.intermediate_point_names,
+        },
+    )
+    return route_id
+
+
+def route_response_fields(request: RouteRequest, result: dict, ordering=None):
+    """Зберігає маршрут і повертає поля відповіді /shortest_path"""
+    return {
+        **request_geometry_fields(request, result["route_coords"]),
+        "distance": round(result["total_distance"] / 1000, 2),
+        "duration_min": duration_minutes(result["travel_time"]),
+        "route_id": store_route(request, result),
+        **(ordering or {}),
+    }
+
+
+def alternative_fields(request: RouteRequest, nodes, blocked_mask, result, app):
+    """Альтернативні маршрути для відповіді /shortest_path (кожен зі своїм route_id)"""
+    compact_graph = app.state.compact_graph
+    source, target = compact_graph.node_indices([nodes[0], nodes[-1]]).tolist()
+    main_edges = compact_graph.path_edge_ids(result["full_route"])
+
+    alternatives = alternative_routes(
+        compact_graph,
+        source,
+        target,
+        main_edges,
+        request.alternatives,
+        request.max_stretch,
+        request.max_overlap,
+        blocked_mask,
+    )
+    return [
+        {
+            **route_response_fields(
+                request, route_result(compact_graph, edges, nodes[0])
+            ),
+            "stretch": round(stretch, 3),
+            "overlap": round(overlap, 3),
         }
+        for edges, stretch, overlap in alternatives
+    ]
 
-        response = {
-            "route": route_coords,
-            "distance": round(total_distance / 1000, 2),
-            "route_id": route_id,
-        }
 
-        return response
+def validate_alternatives(request: RouteRequest):
+    """Альтернативи будуються лише для маршрутів без проміжних точок"""
+    if request.alternatives and request.intermediate_points:
+        raise HTTPException(
+            status_code=400,
+            detail="Alternatives are only supported for routes without "
+            "intermediate points.",
+        )
+
+
+@shortest_path_route.post("/shortest_path")
+def get_shortest_path(request: RouteRequest, app: Request):
+    set_metrics_label("algorithm", request.algorithm)
+    validate_alternatives(request)
+
+    try:
+        request, nodes, points, blocked_mask, ordering = prepare_route(request, app.app)
+
+        cache_key = route_cache_key(
+            request.algorithm, nodes, request.threats, app.app.state.graph_version
+        )
+        result = ROUTE_RESULT_CACHE.get(cache_key)
+
+        if result is None:
+            result = compute_route(request, nodes, points, blocked_mask, app.app)
+            ROUTE_RESULT_CACHE.put(cache_key, result)
+
+        # plot_shortest_path(
+        #     G,
+        #     result["full_route"],
+        #     points,
+        #     request.start_point,
+        #     request.end_point,
+        #     intermediate_points=request.intermediate_points,  # Pass intermediate points
+        #     landmarks=app.app.state.landmarks,
+        #     threats=request.threats,  # Pass threats
+        # )
+
+        response = route_response_fields(request, result, ordering)
+        if request.alternatives:
+            response["alternatives"] = alternative_fields(
+                request, nodes, blocked_mask, result, app.app
+            )
+
+        return route_response(app, response, "route")
 
     except HTTPException:
         raise
@@ -144,6 +427,250 @@ def get_shortest_path(request: RouteRequest, app: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _batch_error(error: Exception) -> dict:
+    if isinstance(error, HTTPException):
+        return {"status": error.status_code, "detail": error.detail}
+    return {"status": 500, "detail": str(error)}
+
+
+def solve_route_batch(batch: RouteBatchRequest, app):
+    """
+    Маршрути пакета зі спільними етапами: маска загроз будується один раз
+    на кожен різний набір загроз, усі точки з однаковою маскою прив'язуються
+    одним запитом до KD-дерева, а всі відсутні в кешах сегменти всіх
+    маршрутів шукаються в пулі одночасно. Помилки — окремо для кожного маршруту.
+    """
+    compact_graph = app.state.compact_graph
+    items = [
+        item if item.threats else item.model_copy(update={"threats": batch.threats})
+        for item in batch.routes
+    ]
+    errors = {}
+    for i, item in enumerate(items):
+        try:
+            validate_alternatives(item)
+        except HTTPException as e:
+            errors[i] = e
+
+    keys = [threats_hash(item.threats) for item in items]
+    masks = {}
+    for item, key in zip(items, keys):
+        if key not in masks:
+            masks[key] = threat_mask(compact_graph, item.threats)
+
+    # routes[i] = (request, nodes, points, ordering)
+    routes = [None] * len(items)
+    for key, mask in masks.items():
+        members = [i for i, item_key in enumerate(keys) if item_key == key]
+        points = [route_points(items[i]) for i in members]
+        nodes = snap_points(compact_graph, [p for pts in points for p in pts], mask)
+
+        offset = 0
+        for i, pts in zip(members, points):
+            routes[i] = (items[i], nodes[offset : offset + len(pts)], pts, None)
+            offset += len(pts)
+
+    for i, (item, nodes, points, _) in enumerate(routes):
+        if i in errors:
+            continue
+        if item.optimize_order and len(item.intermediate_points) >= 2:
+            try:
+                routes[i] = optimize_waypoint_order(
+                    item, nodes, points, masks[keys[i]], app
+                )
+            except Exception as e:
+                errors[i] = e
+
+    results = [None] * len(items)
+    pending = {}
+    groups = {}
+    for i, (item, nodes, points, _) in enumerate(routes):
+        if i in errors:
+            continue
+
+        cache_key = route_cache_key(
+            item.algorithm, nodes, item.threats, app.state.graph_version
+        )
+        results[i] = ROUTE_RESULT_CACHE.get(cache_key)
+        if results[i] is not None:
+            continue
+
+        indices = compact_graph.node_indices(nodes).tolist()
+        segment_keys = [
+            (u, v, *segment_cache_key(item, app)) for u, v in zip(nodes[:-1], nodes[1:])
+        ]
+        segments = [SEGMENT_CACHE.get(key) for key in segment_keys]
+        pending[i] = (cache_key, segment_keys, segments)
+
+        for j, segment_edges in enumerate(segments):
+            if segment_edges is None:
+                groups.setdefault((item.algorithm, keys[i]), []).append(
+                    (i, j, (indices[j], indices[j + 1]))
+                )
+
+    # iter_legs одразу ставить усі сегменти групи в пул
+    solved = {
+        group: iter_legs(group[0], [leg for _, _, leg in members], masks[group[1]])
+        for group, members in groups.items()
+    }
+    for group, members in groups.items():
+        for (i, j, _), found in zip(members, solved[group]):
+            if found is None:
+                points = routes[i][2]
+                errors.setdefault(
+                    i,
+                    HTTPException(
+                        status_code=404,
+                        detail=f"Can't find path between {points[j]} and "
+                        f"{points[j + 1]}.",
+                    ),
+                )
+                continue
+
+            _, segment_keys, segments = pending[i]
+            segments[j] = found[0]
+            SEGMENT_CACHE.put(
+                segment_keys[j], found[0], compact_graph.path_geometry(found[0])
+            )
+
+    for i, (cache_key, _, segments) in pending.items():
+        if i in errors:
+            continue
+        try:
+            results[i] = route_result(
+                compact_graph, np.concatenate(segments), routes[i][1][0]
+            )
+            ROUTE_RESULT_CACHE.put(cache_key, results[i])
+        except Exception as e:
+            errors[i] = e
+
+    output = []
+    for i, (item, nodes, _, ordering) in enumerate(routes):
+        if i not in errors:
+            try:
+                response = route_response_fields(item, results[i], ordering)
+                if item.alternatives:
+                    response["alternatives"] = alternative_fields(
+                        item, nodes, masks[keys[i]], results[i], app
+                    )
+                output.append({"index": i, **response})
+                continue
+            except Exception as e:
+                errors[i] = e
+        output.append({"index": i, "error": _batch_error(errors[i])})
+    return output
+
+
+@shortest_path_route.post("/shortest_path/batch")
+def get_shortest_path_batch(batch: RouteBatchRequest, app: Request):
+    """
+    Many routes in one request. Each result is either a /shortest_path response
+    or an error, so one unreachable pair doesn't fail the whole batch.
+    """
+    algorithms = {item.algorithm for item in batch.routes}
+    if len(algorithms) == 1:
+        set_metrics_label("algorithm", algorithms.pop())
+
+    try:
+        results = solve_route_batch(batch, app.app)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    failed = sum("error" in result for result in results)
+    return ORJSONResponse(
+        {"succeeded": len(results) - failed, "failed": failed, "results": results}
+    )
+
+
+def _ndjson(record: dict) -> bytes:
+    return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def stream_route_records(
+    request: RouteRequest, nodes, points, blocked_mask, app, ordering=None
+):
+    """Записи NDJSON: по одному на кожен сегмент, далі підсумок з route_id"""
+    compact_graph = app.state.compact_graph
+    segments = []
+
+    try:
+        legs = iter_route_segments(
+            compact_graph,
+            nodes,
+            points,
+            request.algorithm,
+            blocked_mask,
+            segment_cache_key(request, app),
+        )
+        for i, segment_edges in enumerate(legs):
+            segments.append(segment_edges)
+            leg = compact_graph.route_summary(segment_edges)
+
+            yield _ndjson(
+                {
+                    "type": "leg",
+                    "index": i,
+                    "from": points[i],
+                    "to": points[i + 1],
+                    **request_geometry_fields(request, leg["route_coords"]),
+                    "distance": round(leg["total_distance"] / 1000, 2),
+                    "duration_min": duration_minutes(leg["travel_time"]),
+                }
+            )
+    except HTTPException as e:
+        yield _ndjson({"type": "error", "status": e.status_code, "detail": e.detail})
+        return
+    except Exception as e:
+        yield _ndjson({"type": "error", "status": 500, "detail": str(e)})
+        return
+
+    result = route_result(compact_graph, np.concatenate(segments), nodes[0])
+    cache_key = route_cache_key(
+        request.algorithm, nodes, request.threats, app.state.graph_version
+    )
+    ROUTE_RESULT_CACHE.put(cache_key, result)
+
+    summary = {
+        "type": "summary",
+        "route_id": store_route(request, result),
+        "distance": round(result["total_distance"] / 1000, 2),
+        "duration_min": duration_minutes(result["travel_time"]),
+        "legs": len(nodes) - 1,
+        **(ordering or {}),
+    }
+    # Альтернативи — після основного маршруту, у підсумковому записі
+    if request.alternatives:
+        try:
+            summary["alternatives"] = alternative_fields(
+                request, nodes, blocked_mask, result, app
+            )
+        except Exception as e:
+            yield _ndjson({"type": "error", "status": 500, "detail": str(e)})
+            return
+
+    yield _ndjson(summary)
+
+
+@shortest_path_route.post("/shortest_path/stream")
+def stream_shortest_path(request: RouteRequest, app: Request):
+    """
+    Streaming variant of /shortest_path. Emits one NDJSON record per leg as soon
+    as it is computed, followed by a summary record with the route_id (and
+    the alternatives, if requested).
+    """
+    set_metrics_label("algorithm", request.algorithm)
+    validate_alternatives(request)
+    try:
+        request, nodes, points, blocked_mask, ordering = prepare_route(request, app.app)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        stream_route_records(request, nodes, points, blocked_mask, app.app, ordering),
+        media_type="application/x-ndjson",
+    )
+
+
 @shortest_path_route.post("/save_route")
 def save_route(
     route_data: RouteSave,
@@ -152,11 +679,10 @@ def save_route(
 ):
     """Save a route to the database for the authenticated user."""
     try:
-        if route_data.route_id not in ROUTES_CACHE:
+        cached_route = ROUTE_STORE.get(route_data.route_id)
+        if cached_route is None:
             raise HTTPException(status_code=404, detail="Route not found")
 
-        cached_route = ROUTES_CACHE[route_data.route_id]
-
         new_route = Route(
             id=route_data.route_id,
             user_id=current_user.id,
@@ -211,6 +737,7 @@ def get_user_routes(
                     "name": route.name,
                     "algorithm": route.algorithm,
                     "distance_km": round(route.total_distance / 1000, 2),
+                    "threat_status": route.threat_status,
                     "created_at": route.created_at.isoformat(),
                 }
                 for route in routes
@@ -220,13 +747,41 @@ def get_user_routes(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@shortest_path_route.get("/routes/export")
+def export_user_routes(
+    current_user: User = Depends(get_current_user),
+    export_format: Literal["txt", "gpx", "geojson", "kml"] = Query(
+        default="geojson", alias="format"
+    ),
+):
+    """
+    Export all saved routes of the authenticated user as one file.
+    Routes are read from the database in batches while the file streams.
+    """
+    media_type, headers = export_headers(export_format, "routes")
+    routes = SavedRoutes(engine, current_user.id)
+    return StreamingResponse(
+        encode_chunks(iter_export(routes, export_format)),
+        media_type=media_type,
+        headers=headers,
+    )
+
+
 @shortest_path_route.get("/routes/{route_id}")
 def get_route_details(
-    route_id: str, session: SessionDep, current_user: User = Depends(get_current_user)
+    route_id: str,
+    session: SessionDep,
+    app: Request,
+    current_user: User = Depends(get_current_user),
+    geometry_format: Literal["coords", "polyline", "delta"] = "coords",
+    tolerance: float | None = Query(None, ge=0),
+    zoom: int | None = Query(None, ge=0, le=22),
+    precision: int = Query(5, ge=1, le=7),
 ):
     """
     Get detailed information about a specific saved route.
-    Includes full route coordinates for map visualization.
+    Includes full route coordinates for map visualization, optionally
+    simplified (tolerance in meters or map zoom) and encoded as a polyline.
     """
 
     try:
@@ -240,13 +795,20 @@ def get_route_details(
         if not route:
             raise HTTPException(status_code=404, detail="Route not found")
 
-        return {
+        details = {
             "id": str(route.id),
             "name": route.name,
             "algorithm": route.algorithm,
             "total_distance": route.total_distance,
             "distance_km": round(route.total_distance / 1000, 2),
-            "route_coords": route.route_coords,
+            **geometry_fields(
+                route.route_coords,
+                "route_coords",
+                geometry_format,
+                tolerance,
+                zoom,
+                precision,
+            ),
             "start_point": route.start_point,
             "end_point": route.end_point,
             "intermediate_points": route.intermediate_points or [],
@@ -256,7 +818,14 @@ def get_route_details(
             "created_at": route.created_at.isoformat(),
             "updated_at": route.updated_at.isoformat() if route.updated_at else None,
             "threats": route.threats or [],
+            "threat_status": route.threat_status,
+            "affected_threat_ids": route.affected_threat_ids or [],
+            "threat_checked_at": route.threat_checked_at.isoformat()
+            if route.threat_checked_at
+            else None,
         }
+
+        return route_response(app, details, "route_coords")
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid route ID format")
     except HTTPException:
@@ -295,31 +864,45 @@ def delete_route(
 
 
 @shortest_path_route.get("/generate_route_file/{route_id}")
-async def generate_route_file(route_id: str, app: Request):
+async def generate_route_file(
+    route_id: str,
+    app: Request,
+    export_format: Literal["txt", "gpx", "geojson", "kml"] = Query(
+        default="txt", alias="format"
+    ),
+):
+    """
+    Route file for download: plain text with settlements along the route,
+    GPX, GeoJSON or KML. The file is streamed in chunks.
+    """
     try:
-        if route_id not in ROUTES_CACHE:
+        data = ROUTE_STORE.get(route_id)
+        if data is None:
             raise HTTPException(status_code=404, detail="Route not found")
 
-        data = ROUTES_CACHE[route_id]
-        G = app.app.state.graph
-        full_route = data["full_route"]
-        route_coords = data["route_coords"]
-        total_distance = data["total_distance"]
-
-        settlements = await get_settlements_along_route(
-            G, full_route, sample_interval=20
-        )
-
-        file_content = build_route_file_content(
-            route_coords, settlements, total_distance
-        )
-
-        file_stream = BytesIO(file_content.encode("utf-8"))
+        settlements = None
+        if export_format == "txt":
+            # Пошук пунктів — CPU-робота, виконується поза циклом подій
+            found = await run_in_threadpool(
+                get_settlements_along_route,
+                app.app.state.compact_graph,
+                data["full_route"],
+                app.app.state.node_settlements,
+                app.app.state.settlement_index,
+                SETTLEMENT_SAMPLE_SPACING_M,
+                SETTLEMENT_RADIUS_KM,
+            )
+            settlements = [found]
 
+        media_type, headers = export_headers(export_format, "route")
         return StreamingResponse(
-            file_stream,
-            media_type="text/plain",
-            headers={"Content-Disposition": "attachment; filename=route.txt"},
+            encode_chunks(
+                iter_export([stored_route_export(data)], export_format, settlements)
+            ),
+            media_type=media_type,
+            headers=headers,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -10,6 +10,7 @@ from models.threat_request import RequestAction, RequestStatus, ThreatRequest
 from models.user import User
 from routes.account import get_current_user
 from schemas.threat_request_create import ThreatRequestCreate
+from utils.threat_events import publish_threat_change
 from validation.role_validation import can_manage_threats
 
 threats_router = APIRouter(prefix="/api/threats", tags=["Threats"])
@@ -40,6 +41,7 @@ def create_threat(
         session.add(new_threat)
         session.commit()
         session.refresh(new_threat)
+        publish_threat_change("created", new_threat.id, new_threat.location)
         return {"message": "Threat created", "threat_id": str(new_threat.id)}
 
     # Military users create a creation request
@@ -70,8 +72,10 @@ def delete_threat(
 
     # Threat-responsible users can delete directly
     if can_manage_threats(current_user.role):
+        deleted = (threat.id, threat.location)
         session.delete(threat)
         session.commit()
+        publish_threat_change("deleted", *deleted)
         return {"message": "Threat deleted"}
 
     # Military users create a deletion request
@@ -138,12 +142,16 @@ def approve_request(
         session.add(threat)
         session.commit()
         session.refresh(threat)
+        publish_threat_change("created", threat.id, threat.location)
         return {"message": "Threat created"}
     else:  # DELETE
         threat = session.get(Threat, request.threat_id)
         if threat:
+            deleted = (threat.id, threat.location)
             session.delete(threat)
         session.commit()
+        if threat:
+            publish_threat_change("deleted", *deleted)
         return {"message": "Threat deleted"}
 
 
@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, conlist
+
+Point = conlist(float, min_length=2, max_length=2)
+
+
+class DistanceMatrixRequest(BaseModel):
+    sources: List[Point] = Field(..., min_length=1, max_length=100)
+    # Без targets матриця рахується між самими sources
+    targets: Optional[List[Point]] = Field(None, min_length=1, max_length=100)
+    threats: Optional[List[List[Point]]] = []
+    durations: bool = False
@@ -0,0 +1,13 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, PositiveFloat, conlist
+
+
+class IsochroneRequest(BaseModel):
+    point: conlist(float, min_length=2, max_length=2)
+    # Межі смуг: км для distance, хвилини для time
+    bands: List[PositiveFloat] = Field(..., min_length=1, max_length=10)
+    metric: Literal["distance", "time"] = "distance"
+    threats: Optional[List[List[conlist(float, min_length=2, max_length=2)]]] = []
+    # Параметр увігнутості оболонки: 1 — опукла, менше — щільніше до вузлів
+    ratio: float = Field(0.3, gt=0, le=1)
@@ -0,0 +1,19 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, conlist
+
+
+class LiveRouteRequest(BaseModel):
+    start_point: conlist(float, min_length=2, max_length=2)
+    end_point: conlist(float, min_length=2, max_length=2)
+    threats: Optional[List[List[conlist(float, min_length=2, max_length=2)]]] = []
+
+    geometry_format: Literal["coords", "polyline", "delta"] = "coords"
+    tolerance: Optional[float] = Field(None, ge=0)
+    zoom: Optional[int] = Field(None, ge=0, le=22)
+    precision: int = Field(5, ge=1, le=7)
+
+
+class LivePositionMessage(BaseModel):
+    type: Literal["position"]
+    point: conlist(float, min_length=2, max_length=2)
@@ -0,0 +1,11 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, conlist
+
+from schemas.route_request import RouteRequest
+
+
+class RouteBatchRequest(BaseModel):
+    routes: List[RouteRequest] = Field(..., min_length=1, max_length=100)
+    # Загрози для маршрутів пакета, що не задають власних
+    threats: Optional[List[List[conlist(float, min_length=2, max_length=2)]]] = []
@@ -1,6 +1,6 @@
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, conlist
+from pydantic import BaseModel, Field, conlist
 
 
 class RouteRequest(BaseModel):
@@ -12,6 +12,21 @@ class RouteRequest(BaseModel):
     start_point_name: Optional[str] = None
     end_point_name: Optional[str] = None
     intermediate_point_names: Optional[List[str]] = []
+    # Переставити проміжні точки так, щоб маршрут був найкоротшим
+    optimize_order: bool = False
+    # Альтернативні маршрути (лише без проміжних точок): скільки, наскільки
+    # довшими за найкоротший і яку частку його довжини можуть з ним ділити
+    alternatives: int = Field(0, ge=0, le=5)
+    max_stretch: float = Field(0.25, gt=0, le=1)
+    max_overlap: float = Field(0.5, ge=0, le=1)
+
+    # Формат геометрії у відповіді: coords — [[lat, lon], ...], polyline —
+    # Google encoded polyline, delta — цілочисельні дельти координат
+    geometry_format: Literal["coords", "polyline", "delta"] = "coords"
+    # Спрощення Дугласа–Пекера: допуск у метрах або рівень zoom карти
+    tolerance: Optional[float] = Field(None, ge=0)
+    zoom: Optional[int] = Field(None, ge=0, le=22)
+    precision: int = Field(5, ge=1, le=7)
 
     def __len__(self):
         point_lst = [self.start_point, self.end_point, self.intermediate_points]
@@ -0,0 +1,55 @@
+import time
+
+import fakeredis
+import pytest
+
+from utils.route_store import RedisRouteStore, RouteStore
+
+ROUTE = {
+    "start_point": [50.45, 30.52],
+    "end_point": [49.84, 24.03],
+    "total_distance": 540123.5,
+    "full_route": [101, 202, 303],
+    "route_coords": [[50.45, 30.52], [50.1, 28.0], [49.84, 24.03]],
+}
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis()
+
+
+def test_route_store_is_abstract():
+    with pytest.raises(TypeError):
+        RouteStore()
+
+
+def test_put_get_round_trip(client):
+    store = RedisRouteStore(client, ttl_seconds=60)
+    store.put("route-1", ROUTE)
+
+    assert store.get("route-1") == ROUTE
+    assert store.stats()["hits"] == 1
+
+
+def test_put_sets_ttl(client):
+    store = RedisRouteStore(client, ttl_seconds=60)
+    store.put("route-1", ROUTE)
+
+    assert 0 < client.ttl(RedisRouteStore.key_prefix + "route-1") <= 60
+
+
+def test_route_expires_after_ttl(client):
+    store = RedisRouteStore(client, ttl_seconds=1)
+    store.put("route-1", ROUTE)
+
+    time.sleep(1.1)
+
+    assert store.get("route-1") is None
+
+
+def test_missing_route(client):
+    store = RedisRouteStore(client, ttl_seconds=60)
+
+    assert store.get("missing") is None
+    assert store.stats()["misses"] == 1
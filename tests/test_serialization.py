@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from utils.serialization import pack_route_buffer, unpack_route_buffer
+
+CONTENT = {
+    "route": [[50.4501, 30.5234], [50.1, 28.0], [49.8397, 24.0297]],
+    "distance": 540.12,
+    "route_id": "00000000-0000-0000-0000-000000000000",
+}
+
+
+def test_buffer_round_trip():
+    decoded = unpack_route_buffer(pack_route_buffer(CONTENT, "route"), "route")
+
+    assert decoded["distance"] == CONTENT["distance"]
+    assert decoded["route_id"] == CONTENT["route_id"]
+    assert decoded["route"].dtype == np.float32
+    np.testing.assert_allclose(decoded["route"], CONTENT["route"], atol=1e-5)
+
+
+def test_buffer_keeps_encoded_polyline_in_json():
+    content = {**CONTENT, "route": "_p~iF~ps|U_ulLnnqC"}
+    decoded = unpack_route_buffer(pack_route_buffer(content, "route"), "route")
+
+    assert decoded == content
+
+
+def test_buffer_with_empty_route():
+    decoded = unpack_route_buffer(pack_route_buffer({"route": []}, "route"), "route")
+
+    assert decoded["route"].shape == (0, 2)
+
+
+def test_unknown_buffer_rejected():
+    data = pack_route_buffer(CONTENT, "route")
+
+    with pytest.raises(ValueError):
+        unpack_route_buffer(b"XXXX" + data[4:], "route")
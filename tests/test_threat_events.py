@@ -0,0 +1,59 @@
+import json
+import queue
+
+import fakeredis
+import pytest
+
+from utils import threat_events
+
+LOCATION = [
+    {"lat": 50.0, "lng": 30.0},
+    {"lat": 50.1, "lng": 30.0},
+    {"lat": 50.1, "lng": 30.1},
+]
+POINTS = [[50.0, 30.0], [50.1, 30.0], [50.1, 30.1]]
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Підписник, що складає події в чергу, і запущена підписка на fakeredis"""
+    monkeypatch.setattr(threat_events, "_LISTENERS", [])
+    received = queue.Queue()
+    threat_events.subscribe(lambda *event: received.put(event))
+
+    server = fakeredis.FakeServer()
+    threat_events.start_threat_events(fakeredis.FakeRedis(server=server))
+    yield received, fakeredis.FakeRedis(server=server)
+    threat_events.stop_threat_events()
+
+
+def test_event_from_another_worker_is_delivered(events):
+    received, other_worker = events
+    event = {"origin": "other", "action": "created", "threat_id": "7", "points": POINTS}
+    other_worker.publish(threat_events.CHANNEL, json.dumps(event))
+
+    assert received.get(timeout=5) == ("created", "7", POINTS)
+
+
+def test_own_event_is_delivered_once(events):
+    received, _ = events
+    threat_events.publish_threat_change("deleted", 7, LOCATION)
+
+    assert received.get(timeout=5) == ("deleted", "7", POINTS)
+    with pytest.raises(queue.Empty):
+        received.get(timeout=1.5)
+
+
+def test_malformed_event_is_ignored(events):
+    received, other_worker = events
+    other_worker.publish(threat_events.CHANNEL, "not json")
+    other_worker.publish(threat_events.CHANNEL, json.dumps({"origin": "other"}))
+
+    with pytest.raises(queue.Empty):
+        received.get(timeout=1.5)
+
+
+def test_memory_url_has_no_client():
+    assert threat_events.create_event_client("memory://") is None
+    with pytest.raises(ValueError):
+        threat_events.create_event_client("kafka://localhost")
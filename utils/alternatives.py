@@ -0,0 +1,108 @@
+import numpy as np
+from scipy.sparse import csgraph
+
+# Скільки кандидатів-via-вузлів перевіряти щонайбільше
+MAX_VIA_CANDIDATES = 200
+
+
+def _tree_path(predecessors, node: int, root: int):
+    """Вузли від node до кореня дерева найкоротших шляхів (включно)"""
+    path = [node]
+    while node != root:
+        node = predecessors[node]
+        if node < 0:
+            return None
+        path.append(node)
+    return path
+
+
+def alternative_routes(
+    compact_graph,
+    source: int,
+    target: int,
+    main_edges,
+    k: int,
+    max_stretch: float,
+    max_overlap: float,
+    blocked_mask=None,
+):
+    """
+    До k альтернатив маршруту source -> target методом плато / via-вузлів:
+    одне дерево найкоротших шляхів від source, одне (по транспонованому
+    графу) до target, обидва обмежені довжиною (1 + max_stretch) * D.
+
+    Via-вузол v дає шлях source -> v -> target з довжиною df[v] + db[v].
+    Кандидати — вузли плато (ребро до v є в обох деревах, тож шлях
+    локально оптимальний навколо v), від коротших до довших. Шлях
+    приймається, якщо він без циклів, не довший за (1 + max_stretch) * D і
+    перекривається з кожним уже прийнятим маршрутом не більше ніж на
+    max_overlap * D.
+
+    Повертає список (id ребер, stretch, overlap).
+    """
+    main_edges = np.asarray(main_edges, dtype=np.int64)
+    shortest = float(compact_graph.lengths[main_edges].sum())
+    if k <= 0 or shortest == 0:
+        return []
+
+    limit = (1 + max_stretch) * shortest
+    graph = compact_graph.adjacency(blocked_mask)
+    df, pf = csgraph.dijkstra(
+        graph, indices=source, limit=limit, return_predecessors=True
+    )
+    db, pb = csgraph.dijkstra(
+        graph.T.tocsr(), indices=target, limit=limit, return_predecessors=True
+    )
+
+    via_length = df + db
+    on_plateau = np.zeros(compact_graph.num_nodes, dtype=bool)
+    has_parent = pf >= 0
+    on_plateau[has_parent] = pb[pf[has_parent]] == np.flatnonzero(has_parent)
+
+    candidates = np.flatnonzero(on_plateau & (via_length <= limit))
+    candidates = candidates[np.argsort(via_length[candidates], kind="stable")]
+
+    accepted = [main_edges]
+    seen = np.zeros(compact_graph.num_nodes, dtype=bool)
+    seen[compact_graph.tails[main_edges]] = True
+    seen[compact_graph.heads[main_edges]] = True
+    alternatives = []
+    tried = 0
+
+    for via in candidates.tolist():
+        if seen[via]:
+            continue
+        tried += 1
+        if tried > MAX_VIA_CANDIDATES:
+            break
+
+        to_via = _tree_path(pf, via, source)
+        from_via = _tree_path(pb, via, target)
+        if to_via is None or from_via is None:
+            continue
+
+        nodes = to_via[::-1] + from_via[1:]
+        seen[nodes] = True
+        if len(set(nodes)) != len(nodes):
+            continue
+
+        edges = compact_graph.edge_ids_between(nodes[:-1], nodes[1:])
+        overlap = max(
+            float(compact_graph.lengths[np.intersect1d(edges, other)].sum())
+            for other in accepted
+        )
+        if overlap > max_overlap * shortest:
+            continue
+
+        accepted.append(edges)
+        alternatives.append(
+            (
+                edges,
+                float(via_length[via]) / shortest - 1,
+                overlap / shortest,
+            )
+        )
+        if len(alternatives) == k:
+            break
+
+    return alternatives
@@ -0,0 +1,313 @@
+import logging
+
+import numpy as np
+import shapely
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+
+class CompactGraph:
+    """
+    Компактне CSR-представлення дорожнього графа, що будується один раз
+    після завантаження. Вузли індексуються за відсортованими osm id,
+    ребра впорядковані за початковим вузлом.
+
+    Геометрії всіх ребер лежать в одному неперервному масиві координат
+    [lat, lon] зі зміщеннями для кожного ребра, тож геометрія маршруту —
+    це вибірка за індексами та конкатенація.
+    """
+
+    def __init__(
+        self,
+        node_ids,
+        xs,
+        ys,
+        indptr,
+        tails,
+        heads,
+        lengths,
+        travel_times,
+        geom_coords,
+        geom_offsets,
+    ):
+        self.node_ids = node_ids
+        self.xs = xs
+        self.ys = ys
+        self.indptr = indptr
+        self.tails = tails
+        self.heads = heads
+        self.lengths = lengths
+        self.travel_times = travel_times
+        self.geom_coords = geom_coords
+        self.geom_offsets = geom_offsets
+
+        # Пошук ребра (u, v): пари відсортовані, для паралельних ребер
+        # першим іде найкоротше — те саме, яке обирає пошук шляху
+        pair_keys = tails.astype(np.int64) * len(node_ids) + heads
+        self._pair_order = np.lexsort((lengths, pair_keys))
+        self._pair_keys = pair_keys[self._pair_order]
+
+        # Найкоротше ребро кожної пари (u, v) у порядку CSR — для scipy csgraph
+        is_first = np.ones(len(self._pair_keys), dtype=bool)
+        is_first[1:] = self._pair_keys[1:] != self._pair_keys[:-1]
+        self.unique_edges = self._pair_order[is_first]
+
+        self._kdtree = None
+        self._reverse_arrays = None
+        self._adjacency = {}
+
+        # Python-доступ до масивів без копіювання для циклів пошуку
+        self.search_arrays = (
+            memoryview(indptr),
+            memoryview(heads),
+            memoryview(tails),
+            memoryview(lengths),
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.heads)
+
+    @classmethod
+    def from_graph(cls, G):
+        logger.info("Building compact graph...")
+
+        node_ids = np.sort(
+            np.fromiter(G.nodes, dtype=np.int64, count=G.number_of_nodes())
+        )
+        xs = np.array([G.nodes[n]["x"] for n in node_ids.tolist()], dtype=np.float64)
+        ys = np.array([G.nodes[n]["y"] for n in node_ids.tolist()], dtype=np.float64)
+
+        edge_count = G.number_of_edges()
+        tails = np.empty(edge_count, dtype=np.int64)
+        heads = np.empty(edge_count, dtype=np.int64)
+        lengths = np.empty(edge_count, dtype=np.float64)
+        travel_times = np.empty(edge_count, dtype=np.float64)
+        geometries = np.full(edge_count, None, dtype=object)
+
+        for i, (u, v, data) in enumerate(G.edges(data=True)):
+            tails[i] = u
+            heads[i] = v
+            lengths[i] = data.get("length", 0)
+            travel_times[i] = data.get("travel_time", np.nan)
+            geometries[i] = data.get("geometry")
+
+        tails = np.searchsorted(node_ids, tails)
+        heads = np.searchsorted(node_ids, heads)
+
+        order = np.argsort(tails, kind="stable")
+        tails, heads = tails[order], heads[order]
+        lengths, travel_times = lengths[order], travel_times[order]
+        geometries = geometries[order]
+
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=len(node_ids)), out=indptr[1:])
+
+        geom_coords, geom_offsets = cls._build_geometry_buffer(
+            xs, ys, tails, heads, geometries
+        )
+
+        logger.info(
+            f"Compact graph: {len(node_ids)} nodes, {edge_count} edges, "
+            f"{len(geom_coords)} geometry vertices"
+        )
+        return cls(
+            node_ids=node_ids,
+            xs=xs,
+            ys=ys,
+            indptr=indptr,
+            tails=tails.astype(np.int32),
+            heads=heads.astype(np.int32),
+            lengths=lengths,
+            travel_times=travel_times,
+            geom_coords=geom_coords,
+            geom_offsets=geom_offsets,
+        )
+
+    @staticmethod
+    def _build_geometry_buffer(xs, ys, tails, heads, geometries):
+        """Один масив координат [lat, lon] для всіх ребер + зміщення ребер"""
+        has_geometry = np.array([g is not None for g in geometries], dtype=bool)
+        geometry_edges = np.flatnonzero(has_geometry)
+
+        # Вершини ребер з геометрією — одним векторизованим викликом shapely
+        lonlat, owner = shapely.get_coordinates(
+            geometries[geometry_edges], return_index=True
+        )
+
+        counts = np.full(len(tails), 2, dtype=np.int64)
+        counts[geometry_edges] = np.bincount(owner, minlength=len(geometry_edges))
+
+        offsets = np.zeros(len(tails) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        coords = np.empty((offsets[-1], 2), dtype=np.float64)
+
+        # Прямі ребра: лише координати кінцевих вузлів
+        straight = np.flatnonzero(~has_geometry)
+        coords[offsets[straight], 0] = ys[tails[straight]]
+        coords[offsets[straight], 1] = xs[tails[straight]]
+        coords[offsets[straight] + 1, 0] = ys[heads[straight]]
+        coords[offsets[straight] + 1, 1] = xs[heads[straight]]
+
+        # Ребра з геометрією: позиція вершини = зміщення ребра + номер у ребрі
+        edge_of_vertex = geometry_edges[owner]
+        group_start = np.zeros(len(geometry_edges), dtype=np.int64)
+        np.cumsum(counts[geometry_edges][:-1], out=group_start[1:])
+        rank = np.arange(len(owner)) - group_start[owner]
+        target = offsets[edge_of_vertex] + rank
+        coords[target, 0] = lonlat[:, 1]
+        coords[target, 1] = lonlat[:, 0]
+
+        return coords, offsets
+
+    @property
+    def reverse_arrays(self):
+        """
+        Вхідні ребра вузлів (для пошуку від цілі): memoryview зміщень за
+        кінцевим вузлом і id ребер у цьому порядку
+        """
+        if self._reverse_arrays is None:
+            order = np.argsort(self.heads, kind="stable")
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.heads, minlength=self.num_nodes), out=indptr[1:])
+            self._reverse_arrays = (memoryview(indptr), memoryview(order))
+        return self._reverse_arrays
+
+    @staticmethod
+    def _unit_vectors(lats, lons):
+        """Точки на одиничній сфері: хордова відстань монотонна з відстанню по сфері"""
+        lat = np.radians(np.asarray(lats, dtype=np.float64))
+        lon = np.radians(np.asarray(lons, dtype=np.float64))
+        return np.column_stack(
+            (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat))
+        )
+
+    @property
+    def kdtree(self):
+        """KD-дерево вузлів, будується при першому використанні"""
+        if self._kdtree is None:
+            self._kdtree = cKDTree(self._unit_vectors(self.ys, self.xs))
+        return self._kdtree
+
+    def nearest_nodes(self, lats, lons, blocked_mask=None, k: int = 16):
+        """
+        Індекси найближчих вузлів для масивів координат одним запитом до
+        KD-дерева. З blocked_mask обирається найближчий незаблокований вузол.
+        """
+        points = self._unit_vectors(lats, lons)
+        if blocked_mask is None:
+            return self.kdtree.query(points)[1]
+
+        k = min(k, self.num_nodes)
+        candidates = self.kdtree.query(points, k=k)[1].reshape(len(points), k)
+        free = ~blocked_mask[candidates]
+        nearest = candidates[np.arange(len(points)), free.argmax(axis=1)]
+
+        # Усі k сусідів у зоні загрози — окремий пошук серед вільних вузлів
+        far = ~free.any(axis=1)
+        if far.any():
+            free_nodes = np.flatnonzero(~blocked_mask)
+            tree = cKDTree(self._unit_vectors(self.ys[free_nodes], self.xs[free_nodes]))
+            nearest[far] = free_nodes[tree.query(points[far])[1]]
+
+        return nearest
+
+    def node_indices(self, node_path):
+        """Індекси вузлів у компактному графі для списку osm id"""
+        return np.searchsorted(self.node_ids, np.asarray(node_path, dtype=np.int64))
+
+    def edge_ids_between(self, tails, heads):
+        """Id ребер (u, v) для масивів індексів; з паралельних — найкоротше"""
+        keys = np.asarray(tails, dtype=np.int64) * self.num_nodes + heads
+        positions = np.searchsorted(self._pair_keys, keys)
+        return self._pair_order[positions]
+
+    def path_edge_ids(self, node_path):
+        indices = self.node_indices(node_path)
+        return self.edge_ids_between(indices[:-1], indices[1:])
+
+    def _base_adjacency(self, weights):
+        """
+        Матриця суміжності без загроз для заданих ваг і id ребер у порядку
+        її елементів; будується один раз на масив ваг
+        """
+        cached = self._adjacency.get(id(weights))
+        # Кеш тримає посилання на ваги, тож id не перевикористається
+        if cached is not None and cached[0] is weights:
+            return cached[1], cached[2]
+
+        edges = self.unique_edges[np.isfinite(weights[self.unique_edges])]
+        indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.tails[edges], minlength=self.num_nodes), out=indptr[1:]
+        )
+        graph = sparse.csr_matrix(
+            (weights[edges], self.heads[edges], indptr),
+            shape=(self.num_nodes, self.num_nodes),
+        )
+        self._adjacency[id(weights)] = (weights, graph, edges)
+        return graph, edges
+
+    def adjacency(self, blocked_mask=None, weights=None):
+        """
+        Розріджена матриця суміжності (csr) з найкоротших ребер між вузлами.
+        Ребра без ваги (наприклад, без travel_time) відкидаються. Ребра, що
+        ведуть у заблоковані вузли, отримують вагу inf — як і в пошуку, ними
+        не пройти; структура матриці спільна з кешованою, копіюються лише ваги.
+        """
+        weights = self.lengths if weights is None else weights
+        graph, edges = self._base_adjacency(weights)
+        if blocked_mask is None:
+            return graph
+
+        data = graph.data.copy()
+        data[blocked_mask[self.heads[edges]]] = np.inf
+        return sparse.csr_matrix(
+            (data, graph.indices, graph.indptr), shape=graph.shape, copy=False
+        )
+
+    def path_geometry(self, edge_ids):
+        """
+        Координати [lat, lon] маршруту за послідовністю ребер. Спільна вершина
+        сусідніх ребер береться один раз.
+        """
+        edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        if len(edge_ids) == 0:
+            return np.empty((0, 2), dtype=np.float64)
+
+        starts = self.geom_offsets[edge_ids]
+        counts = self.geom_offsets[edge_ids + 1] - starts
+
+        # Перша вершина кожного ребра, крім першого, дублює попередню
+        starts[1:] += 1
+        counts[1:] -= 1
+
+        group_start = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=group_start[1:])
+        index = np.repeat(starts - group_start, counts) + np.arange(counts.sum())
+        return self.geom_coords[index]
+
+    def path_nodes(self, edge_ids, source: int):
+        """osm id вузлів шляху за його ребрами (source — індекс першого вузла)"""
+        if len(edge_ids) == 0:
+            return [int(self.node_ids[source])]
+
+        indices = np.append(self.tails[edge_ids[0]], self.heads[edge_ids])
+        return self.node_ids[indices].tolist()
+
+    def route_summary(self, edge_ids):
+        """Геометрія, довжина (м) та час у дорозі (с) маршруту за його ребрами"""
+        edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        travel_time = float(self.travel_times[edge_ids].sum())
+
+        return {
+            "route_coords": self.path_geometry(edge_ids).tolist(),
+            "total_distance": float(self.lengths[edge_ids].sum()),
+            "travel_time": None if np.isnan(travel_time) else travel_time,
+        }
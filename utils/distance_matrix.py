@@ -0,0 +1,52 @@
+import numpy as np
+
+from utils.path_search import dijkstra_to_targets
+
+
+def distance_matrix(
+    compact_graph, sources, targets, blocked_mask=None, with_durations=False
+):
+    """
+    Матриця найкоротших відстаней (м) між вузлами sources і targets
+    (індекси компактного графа): по одному обмеженому пошуку на кожне
+    унікальне джерело, або на кожну ціль по вхідних ребрах, якщо цілей
+    менше. Пошук зупиняється, щойно всі цілі досягнуто, тож пам'ять не
+    залежить від розміру графа.
+
+    Повертає (distances, durations); недосяжні пари — inf, durations — None,
+    якщо не запитано.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+
+    reverse = len(targets) < len(sources)
+    origins, ends = (targets, sources) if reverse else (sources, targets)
+
+    blocked = (
+        memoryview(blocked_mask.view(np.uint8)) if blocked_mask is not None else None
+    )
+    ends = ends.tolist()
+
+    # Пошуки по унікальних джерелах, результати розкладаються назад по рядках
+    unique_origins, origin_rows = np.unique(origins, return_inverse=True)
+    distances = np.empty((len(unique_origins), len(ends)), dtype=np.float64)
+    durations = np.empty_like(distances) if with_durations else None
+
+    for row, origin in enumerate(unique_origins.tolist()):
+        dist, times = dijkstra_to_targets(
+            compact_graph, origin, ends, blocked, reverse, with_durations
+        )
+        distances[row] = dist
+        if with_durations:
+            durations[row] = times
+
+    distances = distances[origin_rows]
+    if with_durations:
+        durations = durations[origin_rows]
+        durations[~np.isfinite(distances)] = np.inf
+
+    if reverse:
+        distances = distances.T
+        durations = durations.T if durations is not None else None
+
+    return distances, durations
@@ -0,0 +1,162 @@
+import heapq
+import math
+
+import numpy as np
+
+# Менший за земний радіус, щоб оцінка гарантовано не перевищувала довжину доріг
+_HEURISTIC_RADIUS_M = 6_360_000
+_INF = float("inf")
+
+
+class DStarLite:
+    """
+    D* Lite на компактному графі: пошук іде від цілі, тож при зміні
+    заблокованих вузлів або переміщенні початку перераховуються лише
+    зачеплені вершини, а не весь шлях.
+
+    source, target — індекси вузлів; blocked — масив bool (вузли в зонах
+    загроз), ребра в заблоковані вузли мають нескінченну вартість.
+    """
+
+    def __init__(self, compact_graph, source: int, target: int, blocked=None):
+        self.graph = compact_graph
+        self.source = source
+        self.target = target
+        self.blocked = (
+            np.zeros(compact_graph.num_nodes, dtype=bool)
+            if blocked is None
+            else blocked.copy()
+        )
+
+        self._indptr, self._heads, _, self._lengths = compact_graph.search_arrays
+        self._rev_indptr, self._rev_edges = compact_graph.reverse_arrays
+        self._tails = memoryview(compact_graph.tails)
+        self._blocked_view = memoryview(self.blocked.view(np.uint8))
+        self._lat = np.radians(compact_graph.ys)
+        self._lon = np.radians(compact_graph.xs)
+
+        self.g = {}
+        self.rhs = {target: 0.0}
+        self.km = 0.0
+        self._open = {}
+        self._heap = []
+        self._push(target, self._key(target))
+
+    def _heuristic(self, a: int, b: int) -> float:
+        """Відстань по великому колу (м) — нижня оцінка довжини дороги"""
+        dlat = self._lat[b] - self._lat[a]
+        dlon = self._lon[b] - self._lon[a]
+        h = (
+            math.sin(dlat / 2) ** 2
+            + math.cos(self._lat[a]) * math.cos(self._lat[b]) * math.sin(dlon / 2) ** 2
+        )
+        return 2 * _HEURISTIC_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+    def _key(self, node: int):
+        best = min(self.g.get(node, _INF), self.rhs.get(node, _INF))
+        return (best + self._heuristic(self.source, node) + self.km, best)
+
+    def _push(self, node: int, key):
+        self._open[node] = key
+        heapq.heappush(self._heap, (key, node))
+
+    def _top(self):
+        # Застарілі записи купи (вузол уже видалено або перевставлено) пропускаються
+        while self._heap:
+            key, node = self._heap[0]
+            if self._open.get(node) == key:
+                return key, node
+            heapq.heappop(self._heap)
+        return (_INF, _INF), None
+
+    def _edge_cost(self, edge: int) -> float:
+        return _INF if self._blocked_view[self._heads[edge]] else self._lengths[edge]
+
+    def _update_vertex(self, node: int):
+        if node != self.target:
+            best = _INF
+            for edge in range(self._indptr[node], self._indptr[node + 1]):
+                cost = self._edge_cost(edge) + self.g.get(self._heads[edge], _INF)
+                if cost < best:
+                    best = cost
+            self.rhs[node] = best
+
+        self._open.pop(node, None)
+        if self.g.get(node, _INF) != self.rhs.get(node, _INF):
+            self._push(node, self._key(node))
+
+    def _update_predecessors(self, node: int):
+        for i in range(self._rev_indptr[node], self._rev_indptr[node + 1]):
+            self._update_vertex(self._tails[self._rev_edges[i]])
+
+    def compute(self):
+        """Доводить g до консистентності для поточного початку"""
+        while True:
+            top_key, node = self._top()
+            source_g = self.g.get(self.source, _INF)
+            source_rhs = self.rhs.get(self.source, _INF)
+            if node is None or (
+                top_key >= self._key(self.source) and source_rhs == source_g
+            ):
+                return
+
+            new_key = self._key(node)
+            if top_key < new_key:
+                self._push(node, new_key)
+                continue
+
+            heapq.heappop(self._heap)
+            del self._open[node]
+            node_g = self.g.get(node, _INF)
+            node_rhs = self.rhs.get(node, _INF)
+
+            if node_g > node_rhs:
+                self.g[node] = node_rhs
+                self._update_predecessors(node)
+            else:
+                self.g[node] = _INF
+                self._update_vertex(node)
+                self._update_predecessors(node)
+
+    def path(self):
+        """
+        (масив id ребер, довжина) від поточного початку до цілі або None,
+        якщо шляху немає
+        """
+        self.compute()
+        if self.g.get(self.source, _INF) == _INF:
+            return None
+
+        edges = []
+        node = self.source
+        while node != self.target:
+            best_edge, best = None, _INF
+            for edge in range(self._indptr[node], self._indptr[node + 1]):
+                cost = self._edge_cost(edge) + self.g.get(self._heads[edge], _INF)
+                if cost < best:
+                    best_edge, best = edge, cost
+            if best_edge is None or len(edges) > self.graph.num_nodes:
+                return None
+            edges.append(best_edge)
+            node = self._heads[best_edge]
+
+        edges = np.array(edges, dtype=np.int64)
+        return edges, float(self.graph.lengths[edges].sum())
+
+    def move_source(self, source: int):
+        """Новий початок (транспорт рухається); ключі черги лишаються валідними"""
+        self.km += self._heuristic(self.source, source)
+        self.source = source
+
+    def set_blocked(self, nodes, blocked: bool):
+        """Блокує або розблоковує вузли і готує інкрементальне відновлення"""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        nodes = nodes[self.blocked[nodes] != blocked]
+        if len(nodes) == 0:
+            return False
+
+        self.blocked[nodes] = blocked
+        # Вартість ребер у змінені вузли змінилась — оновлюємо їхні початки
+        for node in nodes.tolist():
+            self._update_predecessors(node)
+        return True
@@ -0,0 +1,34 @@
+import numpy as np
+import shapely
+from scipy.sparse import csgraph
+
+
+def reachable_costs(
+    compact_graph, source: int, limit: float, blocked_mask=None, metric="distance"
+):
+    """
+    Обмежений пошук з одного вузла: вартість (м або с) до кожного вузла,
+    inf — для недосяжних або дальших за limit.
+    """
+    weights = compact_graph.travel_times if metric == "time" else None
+    graph = compact_graph.adjacency(blocked_mask, weights)
+    return csgraph.dijkstra(graph, directed=True, indices=source, limit=limit)
+
+
+def reachable_area(compact_graph, costs, budget: float, ratio: float):
+    """
+    Область досяжності як увігнута оболонка вузлів з вартістю <= budget
+    (shapely geometry у lon/lat) і кількість цих вузлів.
+    """
+    reachable = np.flatnonzero(costs <= budget)
+    points = shapely.multipoints(
+        np.column_stack((compact_graph.xs[reachable], compact_graph.ys[reachable]))
+    )
+
+    area = shapely.concave_hull(points, ratio=ratio)
+
+    # З 1-2 точок або точок на одній лінії полігон не вийде — невеликий буфер
+    if area.geom_type not in ("Polygon", "MultiPolygon"):
+        area = area.buffer(1e-4)
+
+    return area, len(reachable)
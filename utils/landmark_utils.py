@@ -2,6 +2,7 @@ import logging
 import random
 
 import networkx as nx
+import numpy as np
 import osmnx as ox
 
 logger = logging.getLogger(__name__)
@@ -97,3 +98,16 @@ def preprocess_landmarks_distances(G, landmarks):
             G, node, weight="length"
         )
     return distances
+
+
+def landmark_distance_table(compact_graph, landmarks, landmark_distances):
+    """
+    Таблиця відстаней від ориентирів до вузлів компактного графа
+    (рядок на ориентир; недосяжні вузли — 0, як і раніше в евристиці)
+    """
+    table = np.zeros((len(landmarks), compact_graph.num_nodes), dtype=np.float64)
+    for row, landmark in enumerate(landmarks):
+        distances = landmark_distances[landmark]
+        indices = compact_graph.node_indices(list(distances.keys()))
+        table[row, indices] = list(distances.values())
+    return table
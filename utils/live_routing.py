@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import uuid
+
+import numpy as np
+
+from utils.dstar_lite import DStarLite
+from utils.utils import threat_mask
+
+
+class LiveRouteSession:
+    """
+    Активний маршрут транспорту: стан D* Lite між оновленнями. Зміни загроз
+    надходять у чергу events і обробляються задачею сесії, тож планувальник
+    змінюється лише в одному місці.
+    """
+
+    def __init__(self, compact_graph, start_point, end_point, threats, loop):
+        self.id = str(uuid.uuid4())
+        self.graph = compact_graph
+        self.loop = loop
+        self.events = asyncio.Queue()
+
+        # Вузли, заблоковані кожною загрозою сесії (для коректного видалення)
+        self.threat_nodes = {
+            f"request-{i}": np.flatnonzero(threat_mask(compact_graph, [threat]))
+            for i, threat in enumerate(threats or [])
+        }
+        blocked = np.zeros(compact_graph.num_nodes, dtype=bool)
+        for nodes in self.threat_nodes.values():
+            blocked[nodes] = True
+
+        source, target = compact_graph.nearest_nodes(
+            [start_point[0], end_point[0]], [start_point[1], end_point[1]], blocked
+        ).tolist()
+        self.planner = DStarLite(compact_graph, source, target, blocked)
+        self.path_edges = np.empty(0, dtype=np.int64)
+        self.path_nodes = np.empty(0, dtype=np.int64)
+
+    def route(self):
+        """Поточний шлях (id ребер, довжина) або None"""
+        found = self.planner.path()
+        self.path_edges = found[0] if found is not None else np.empty(0, np.int64)
+        self.path_nodes = self.graph.heads[self.path_edges]
+        return found
+
+    def reroute(self):
+        """Відновлений шлях і чи відрізняється він від попереднього"""
+        previous = self.path_edges
+        found = self.route()
+        return found, not np.array_equal(previous, self.path_edges)
+
+    def move_to(self, lat: float, lon: float):
+        """Нова позиція транспорту: шлях відновлюється від найближчого вузла"""
+        source = self.graph.nearest_nodes([lat], [lon], self.planner.blocked)[0]
+        self.planner.move_source(int(source))
+        return self.route()
+
+    def apply_threat(self, action: str, threat_id: str, nodes):
+        """
+        Застосовує зміну загрози. Повертає True, якщо маршрут треба
+        перерахувати: нова загроза накрила вузли поточного шляху, або
+        видалена загроза звільнила вузли, через які могла пройти коротша
+        дорога. Інакше зміна лише запам'ятовується без пошуку.
+        """
+        if action == "created":
+            self.threat_nodes[threat_id] = nodes
+            self.planner.set_blocked(nodes, True)
+            return bool(np.isin(self.path_nodes, nodes).any())
+
+        removed = self.threat_nodes.pop(threat_id, None)
+        if removed is None:
+            return False
+
+        still_blocked = np.zeros(self.graph.num_nodes, dtype=bool)
+        for other in self.threat_nodes.values():
+            still_blocked[other] = True
+        return self.planner.set_blocked(removed[~still_blocked[removed]], False)
+
+    def notify(self, event):
+        """Потокобезпечно передає подію задачі сесії"""
+        self.loop.call_soon_threadsafe(self.events.put_nowait, event)
+
+
+class LiveRouteRegistry:
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def register(self, session: LiveRouteSession):
+        with self._lock:
+            self._sessions[session.id] = session
+
+    def unregister(self, session: LiveRouteSession):
+        with self._lock:
+            self._sessions.pop(session.id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def threat_changed(self, action: str, threat_id: str, points):
+        """
+        Підписник utils.threat_events: маска нової загрози рахується один раз
+        для всіх сесій, відновлення шляху — лише в зачеплених сесіях.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+        if not sessions:
+            return
+
+        nodes = None
+        if action == "created":
+            nodes = np.flatnonzero(threat_mask(sessions[0].graph, [points]))
+
+        for session in sessions:
+            session.notify((action, threat_id, nodes))
+
+
+LIVE_ROUTES = LiveRouteRegistry()
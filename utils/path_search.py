@@ -0,0 +1,153 @@
+import heapq
+
+import numpy as np
+
+
+def astar_edges(compact_graph, source: int, target: int, blocked=None, heuristic=None):
+    """
+    A* на компактному графі. Без евристики — звичайний Дейкстра.
+
+    source, target — індекси вузлів; blocked — bytearray/масив з 1 для вузлів
+    у зонах загроз; heuristic — функція h(v), нижня оцінка відстані від v
+    до target; викликається лише для вузлів, яких досяг пошук.
+
+    Повертає (масив id ребер шляху, довжина шляху) або None, якщо шляху немає.
+    Для паралельних ребер у шлях потрапляє саме те ребро, яке обрав пошук.
+    """
+    indptr, heads, tails, lengths = compact_graph.search_arrays
+
+    dist = {source: 0.0}
+    pred_edge = {}
+    explored = set()
+    heap = [(heuristic(source) if heuristic is not None else 0.0, 0.0, source)]
+
+    while heap:
+        _, g, u = heapq.heappop(heap)
+
+        if u == target:
+            break
+        if u in explored:
+            continue
+        explored.add(u)
+
+        for edge in range(indptr[u], indptr[u + 1]):
+            v = heads[edge]
+            if blocked is not None and blocked[v]:
+                continue
+
+            new_g = g + lengths[edge]
+            if new_g < dist.get(v, float("inf")):
+                dist[v] = new_g
+                pred_edge[v] = edge
+                h = heuristic(v) if heuristic is not None else 0.0
+                heapq.heappush(heap, (new_g + h, new_g, v))
+    else:
+        return None
+
+    path_edges = []
+    node = target
+    while node != source:
+        edge = pred_edge[node]
+        path_edges.append(edge)
+        node = tails[edge]
+    path_edges.reverse()
+
+    return np.array(path_edges, dtype=np.int64), dist[target]
+
+
+def dijkstra_edges(compact_graph, source: int, target: int, blocked=None):
+    return astar_edges(compact_graph, source, target, blocked)
+
+
+def dijkstra_to_targets(
+    compact_graph, source: int, targets, blocked=None, reverse=False, with_times=False
+):
+    """
+    Дейкстра від source, що зупиняється, щойно всі targets досягнуто, тож
+    пам'ять — лише на переглянуті вузли. При reverse пошук іде по вхідних
+    ребрах: результат — відстані від кожної цілі до source.
+
+    Повертає (відстані, час у дорозі) до кожної з targets у тому ж порядку;
+    недосяжні — inf, час — None, якщо не запитано. Час рахується вздовж
+    знайденого найкоротшого за довжиною шляху.
+    """
+    indptr, heads, tails, lengths = compact_graph.search_arrays
+    if reverse:
+        indptr, edge_order = compact_graph.reverse_arrays
+        neighbours = tails
+    else:
+        edge_order = None
+        neighbours = heads
+    travel_times = memoryview(compact_graph.travel_times) if with_times else None
+
+    remaining = set(targets)
+    dist = {source: 0.0}
+    times = {source: 0.0}
+    explored = set()
+    heap = [(0.0, source)]
+
+    while heap and remaining:
+        g, u = heapq.heappop(heap)
+        if u in explored:
+            continue
+        explored.add(u)
+        remaining.discard(u)
+
+        # Ребра, що ведуть у заблокований вузол, відкидаються; у зворотному
+        # пошуку це всі вхідні ребра самого u
+        if reverse and blocked is not None and blocked[u]:
+            continue
+
+        for i in range(indptr[u], indptr[u + 1]):
+            edge = edge_order[i] if reverse else i
+            v = neighbours[edge]
+            if not reverse and blocked is not None and blocked[v]:
+                continue
+
+            new_g = g + lengths[edge]
+            if new_g < dist.get(v, float("inf")):
+                dist[v] = new_g
+                if with_times:
+                    times[v] = times[u] + travel_times[edge]
+                heapq.heappush(heap, (new_g, v))
+
+    found = [t in explored for t in targets]
+    distances = np.array(
+        [dist[t] if ok else np.inf for t, ok in zip(targets, found)], dtype=np.float64
+    )
+    if not with_times:
+        return distances, None
+    durations = np.array(
+        [times[t] if ok else np.inf for t, ok in zip(targets, found)], dtype=np.float64
+    )
+    return distances, durations
+
+
+def landmark_heuristic(landmark_table, target: int):
+    """
+    h(v) = max |d(l, v) - d(l, target)| по всіх ориентирах. Стовпець цілі
+    береться один раз, стовпець v — лише коли пошук дійшов до v, тож на
+    сегмент не виділяється масив розміром (ориентири x вузли).
+    """
+    num_nodes = landmark_table.shape[1]
+    flat = memoryview(np.ascontiguousarray(landmark_table).reshape(-1))
+    rows = list(
+        zip(
+            range(0, landmark_table.size, num_nodes),
+            landmark_table[:, target].tolist(),
+        )
+    )
+
+    def heuristic(v):
+        return max(abs(flat[offset + v] - to_target) for offset, to_target in rows)
+
+    return heuristic
+
+
+def alt_edges(compact_graph, source: int, target: int, landmark_table, blocked=None):
+    """ALT: A* з оцінкою за ориентирами (landmark_heuristic)"""
+    if len(landmark_table) == 0:
+        return astar_edges(compact_graph, source, target, blocked)
+
+    heuristic = landmark_heuristic(landmark_table, target)
+    return astar_edges(compact_graph, source, target, blocked, heuristic)
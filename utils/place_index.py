@@ -0,0 +1,219 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+# Українська -> латиниця (офіційна транслітерація 2010 р.); на початку
+# слова є, ї, й, ю, я передаються інакше
+_TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e",
+    "є": "ie", "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i",
+    "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia",
+    # російські літери в альтернативних назвах і запитах
+    "ё": "e", "ы": "y", "э": "e", "ъ": "",
+}  # fmt: skip
+_TRANSLIT_INITIAL = {"є": "ye", "ї": "yi", "й": "y", "ю": "yu", "я": "ya"}
+
+_APOSTROPHES = re.compile(r"['’ʼ`]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Вага типу населеного пункту (коди GeoNames) у ранжуванні
+TYPE_WEIGHT = {
+    "PPLC": 4.0,
+    "PPLA": 3.0,
+    "PPLA2": 2.0,
+    "PPLA3": 1.0,
+    "PPLA4": 0.5,
+}
+
+# Бали за тип збігу; до них додається ранг пункту (вага типу + lg населення)
+EXACT_SCORE = 40.0
+PREFIX_SCORE = 30.0
+WORD_PREFIX_SCORE = 20.0
+FUZZY_SCORE = 10.0
+BBOX_BONUS = 5.0
+
+# Мінімальна схожість за триграмами (коефіцієнт Дайса) для нечіткого збігу
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+
+def _transliterate(text: str) -> str:
+    out = []
+    previous = " "
+    # «зг» передається як «zgh», щоб не сплутати з «жз»
+    for char in text.replace("зг", "zgh"):
+        if previous.isalpha() or char not in _TRANSLIT_INITIAL:
+            out.append(_TRANSLIT.get(char, char))
+        else:
+            out.append(_TRANSLIT_INITIAL[char])
+        previous = char
+    return "".join(out)
+
+
+def normalize(text: str) -> str:
+    """
+    Ключ для пошуку: нижній регістр, кирилиця транслітерована, діакритика
+    і апострофи прибрані, решта знаків — пробіли. «Київ», «Kyiv» і «Kyïv»
+    дають однаковий ключ «kyiv».
+    """
+    text = _APOSTROPHES.sub("", text.lower())
+    text = unicodedata.normalize("NFKD", _transliterate(text))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _is_searchable(name: str, key: str) -> bool:
+    # Назви іншими письмами (китайською, арабською ...) після нормалізації
+    # втрачають літери — такі не індексуються
+    letters = sum(char.isalpha() for char in name)
+    return len(key) >= 2 and len(key.replace(" ", "")) >= letters // 2
+
+
+def _trigrams(key: str):
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class PlaceIndex:
+    """
+    Індекс назв населених пунктів у пам'яті для автодоповнення. Будується
+    з тих самих рядків, що й SettlementIndex (load_valid_settlements).
+
+    Кожна назва (основна й альтернативні) нормалізується в латиницю; у
+    відсортованому масиві ключів лежать повні назви та їхні суфікси з
+    початку кожного слова («tserkva» для «Bila Tserkva»), тож пошук за
+    префіксом — два бінарні пошуки. Якщо префіксних збігів замало,
+    додаються нечіткі збіги за триграмами (помилки в назві).
+    """
+
+    def __init__(self, settlements):
+        settlements = list(settlements)
+        self.places = [
+            {
+                "id": s.id,
+                "geoname_id": s.geoname_id,
+                "name": s.name,
+                "type": s.type,
+                "population": s.population or 0,
+                "country": s.country,
+                "lat": s.lat,
+                "lon": s.lon,
+            }
+            for s in settlements
+        ]
+        population = np.array([p["population"] for p in self.places], dtype=np.float64)
+        self.rank = np.array(
+            [TYPE_WEIGHT.get(p["type"], 0.0) for p in self.places]
+        ) + np.log10(population + 1.0)
+        self.lats = np.array([p["lat"] for p in self.places], dtype=np.float64)
+        self.lons = np.array([p["lon"] for p in self.places], dtype=np.float64)
+
+        # Унікальні нормалізовані назви кожного пункту
+        self.names = []
+        name_owners = []
+        for i, settlement in enumerate(settlements):
+            seen = set()
+            for name in [settlement.name, *(settlement.alternate_names or [])]:
+                key = normalize(name)
+                if key not in seen and _is_searchable(name, key):
+                    seen.add(key)
+                    self.names.append((key, name))
+                    name_owners.append(i)
+        self.name_owners = np.array(name_owners, dtype=np.int64)
+
+        entries = []
+        for name_id, (key, _) in enumerate(self.names):
+            entries.append((key, name_id, False))
+            for match in re.finditer(r" (?=\S)", key):
+                entries.append((key[match.end() :], name_id, True))
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.key_lengths = np.array([len(key) for key in self.keys], dtype=np.int64)
+        self.key_names = np.array(
+            [name_id for _, name_id, _ in entries], dtype=np.int64
+        )
+        self.key_is_word = np.array([word for _, _, word in entries], dtype=bool)
+
+        postings = {}
+        for name_id, (key, _) in enumerate(self.names):
+            for trigram in _trigrams(key):
+                postings.setdefault(trigram, []).append(name_id)
+        self.trigrams = {
+            trigram: np.array(ids, dtype=np.int64) for trigram, ids in postings.items()
+        }
+        self.trigram_counts = np.array(
+            [len(_trigrams(key)) for key, _ in self.names], dtype=np.float64
+        )
+
+    def __len__(self):
+        return len(self.places)
+
+    def _prefix_matches(self, query: str):
+        """(id назв, бали) для ключів, що починаються з query"""
+        lo = bisect.bisect_left(self.keys, query)
+        hi = bisect.bisect_left(self.keys, query + "\uffff", lo)
+        name_ids = self.key_names[lo:hi]
+        is_word = self.key_is_word[lo:hi]
+        scores = np.where(is_word, WORD_PREFIX_SCORE, PREFIX_SCORE)
+        exact = ~is_word & (self.key_lengths[lo:hi] == len(query))
+        scores = np.where(exact, EXACT_SCORE, scores)
+        return name_ids, scores
+
+    def _fuzzy_matches(self, query: str):
+        """(id назв, бали) для назв, схожих за триграмами (коефіцієнт Дайса)"""
+        query_grams = _trigrams(query)
+        grams = [self.trigrams[g] for g in query_grams if g in self.trigrams]
+        if not grams:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.names))
+        similarity = 2 * shared / (len(query_grams) + self.trigram_counts)
+        name_ids = np.flatnonzero(similarity >= MIN_TRIGRAM_SIMILARITY)
+        return name_ids, FUZZY_SCORE * similarity[name_ids]
+
+    def search(self, query: str, limit: int = 10, bbox=None):
+        """
+        Найкращі limit пунктів для запиту. bbox (min_lon, min_lat, max_lon,
+        max_lat) не фільтрує, а піднімає пункти всередині області.
+        """
+        query = normalize(query)
+        if not query or not self.names:
+            return []
+
+        name_ids, scores = self._prefix_matches(query)
+        if len(np.unique(self.name_owners[name_ids])) < limit and len(query) >= 3:
+            fuzzy_ids, fuzzy_scores = self._fuzzy_matches(query)
+            name_ids = np.concatenate((name_ids, fuzzy_ids))
+            scores = np.concatenate((scores, fuzzy_scores))
+        if len(name_ids) == 0:
+            return []
+
+        owners = self.name_owners[name_ids]
+        scores = scores + self.rank[owners]
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            inside = (
+                (self.lons[owners] >= min_lon)
+                & (self.lons[owners] <= max_lon)
+                & (self.lats[owners] >= min_lat)
+                & (self.lats[owners] <= max_lat)
+            )
+            scores = scores + BBOX_BONUS * inside
+
+        # Найкращий збіг кожного пункту, далі top-limit за балами
+        order = np.argsort(-scores, kind="stable")
+        owners, first = np.unique(owners[order], return_index=True)
+        best = order[first]
+        top = best[np.argsort(-scores[best], kind="stable")[:limit]]
+
+        return [self._place(name_ids[i], scores[i]) for i in top.tolist()]
+
+    def _place(self, name_id: int, score: float) -> dict:
+        return {
+            **self.places[self.name_owners[name_id]],
+            "matched_name": self.names[name_id][1],
+            "score": round(float(score), 3),
+        }
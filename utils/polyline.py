@@ -0,0 +1,135 @@
+import numpy as np
+
+# Метрів в одному градусі широти (сферична Земля)
+METERS_PER_DEGREE = 111_320.0
+
+# Метрів на піксель на екваторі для zoom 0 (тайли 256 px, Web Mercator)
+METERS_PER_PIXEL_ZOOM0 = 156_543.03392
+
+
+def zoom_tolerance(zoom: int, latitude: float, pixels: float = 1.0) -> float:
+    """Допуск спрощення в метрах, що відповідає `pixels` пікселям на zoom"""
+    return pixels * METERS_PER_PIXEL_ZOOM0 * np.cos(np.radians(latitude)) / 2**zoom
+
+
+def _project(coords):
+    """[lat, lon] -> локальні метри (рівнопроміжна проекція біля середньої широти)"""
+    scale_x = METERS_PER_DEGREE * np.cos(np.radians(coords[:, 0].mean()))
+    return np.column_stack((coords[:, 1] * scale_x, coords[:, 0] * METERS_PER_DEGREE))
+
+
+def simplify_mask(coords, tolerance: float):
+    """
+    Дуглас–Пекер: маска вершин, що залишаються при допуску `tolerance` метрів.
+    Перша й остання вершини залишаються завжди.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    keep = np.zeros(len(coords), dtype=bool)
+    if len(coords) == 0:
+        return keep
+
+    keep[[0, -1]] = True
+    if len(coords) < 3 or tolerance <= 0:
+        keep[:] = True
+        return keep
+
+    points = _project(coords)
+    stack = [(0, len(coords) - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        a, b = points[start], points[end]
+        inner = points[start + 1 : end]
+        ab = b - a
+        ab_len2 = ab @ ab
+
+        # Відстань до відрізка [a, b], а не до прямої — важливо для петель
+        if ab_len2 == 0:
+            offsets = inner - a
+        else:
+            t = np.clip((inner - a) @ ab / ab_len2, 0.0, 1.0)
+            offsets = inner - (a + t[:, None] * ab)
+        distances = np.einsum("ij,ij->i", offsets, offsets)
+
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance * tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return keep
+
+
+def simplify(coords, tolerance: float):
+    coords = np.asarray(coords, dtype=np.float64)
+    return coords[simplify_mask(coords, tolerance)]
+
+
+def delta_encode(coords, precision: int = 5):
+    """
+    Цілочисельні дельти [dlat0, dlon0, dlat1, dlon1, ...] з множником
+    10**precision; перша пара — абсолютні координати.
+    """
+    scaled = np.round(np.asarray(coords, dtype=np.float64) * 10**precision)
+    scaled = scaled.astype(np.int64).reshape(-1, 2)
+    return np.diff(scaled, axis=0, prepend=np.zeros((1, 2), np.int64)).ravel()
+
+
+def encode_polyline(coords, precision: int = 5) -> str:
+    """Google encoded polyline для [[lat, lon], ...] (векторизовано)"""
+    deltas = delta_encode(coords, precision)
+    if len(deltas) == 0:
+        return ""
+
+    # zig-zag: знак у молодшому біті
+    values = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+    # Кожне значення — до 13 5-бітових блоків, молодші першими
+    shifts = np.arange(13, dtype=np.uint64) * np.uint64(5)
+    chunks = (values[:, None] >> shifts) & np.uint64(0x1F)
+
+    bit_length = np.zeros(len(values), dtype=np.int64)
+    nonzero = values > 0
+    bit_length[nonzero] = np.floor(np.log2(values[nonzero].astype(np.float64))) + 1
+    n_chunks = np.maximum(1, -(-bit_length // 5))
+
+    column = np.arange(13)
+    used = column < n_chunks[:, None]
+    continued = column < (n_chunks - 1)[:, None]
+
+    chars = chunks.astype(np.uint8) + 63
+    chars[continued] += 0x20
+    return chars[used].tobytes().decode("ascii")
+
+
+def format_geometry(
+    coords,
+    geometry_format: str = "coords",
+    tolerance: float | None = None,
+    zoom: int | None = None,
+    precision: int = 5,
+):
+    """
+    Геометрія маршруту для відповіді клієнту: спрощена за допуском у метрах
+    або за рівнем zoom (допуск має пріоритет), у форматі
+    coords ([[lat, lon], ...]), polyline (рядок) чи delta (список цілих).
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+    if tolerance is None and zoom is not None and len(coords):
+        tolerance = zoom_tolerance(zoom, float(coords[:, 0].mean()))
+    if tolerance:
+        coords = simplify(coords, tolerance)
+
+    if geometry_format == "polyline":
+        return encode_polyline(coords, precision)
+    if geometry_format == "delta":
+        return delta_encode(coords, precision).tolist()
+    if geometry_format == "coords":
+        return coords.tolist()
+
+    raise ValueError(f"Unknown geometry format: {geometry_format}")
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from utils.spatial_index import SpatialIndex, to_geometry
+
+
+def estimate_size(value) -> int:
+    """Приблизний розмір об'єкта в байтах (для обліку пам'яті кешу)"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+
+    if isinstance(value, (list, tuple)):
+        size = sys.getsizeof(value)
+        if value:
+            # Маршрути — однорідні списки, тому оцінюємо по першому елементу
+            size += len(value) * estimate_size(value[0])
+        return size
+
+    return sys.getsizeof(value)
+
+
+def threats_hash(threats) -> str:
+    """Стабільний хеш набору зон загроз"""
+    payload = json.dumps(threats or [], separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def route_cache_key(algorithm, nodes, threats, graph_version):
+    return (algorithm, tuple(nodes), threats_hash(threats), graph_version)
+
+
+class BoundedCache:
+    """
+    Потокобезпечний LRU-кеш з TTL та обмеженням загального розміру в байтах.
+
+    Найдавніше використані записи витісняються, коли сумарний розмір
+    перевищує max_bytes; прострочені записи видаляються при зверненні.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, sizeof=estimate_size):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        # Реентерабельний: GeoBoundedCache індексує запис під тим самим замком
+        self._lock = threading.RLock()
+
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            # Запис, більший за весь кеш, не зберігаємо
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[2] > time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate_percent": round(self.hits / lookups * 100, 2)
+                if lookups
+                else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class GeoBoundedCache(BoundedCache):
+    """
+    BoundedCache з просторовим індексом записів: при зміні загроз можна
+    видалити лише ті записи, геометрія яких перетинає зону.
+
+    geometry(value) — геометрія запису (shapely або [[lat, lon], ...]);
+    її також можна передати явно в put.
+    """
+
+    def __init__(self, max_bytes, ttl_seconds, geometry=None, sizeof=estimate_size):
+        super().__init__(max_bytes, ttl_seconds, sizeof)
+        self._geometry = geometry
+        self.index = SpatialIndex()
+        self.invalidations = 0
+
+    def put(self, key, value, geometry=None):
+        if geometry is None and self._geometry is not None:
+            geometry = self._geometry(value)
+        geometry = to_geometry(geometry) if geometry is not None else None
+
+        with self._lock:
+            super().put(key, value)
+            # Запис могли не прийняти (завеликий) або одразу витіснити
+            if geometry is not None and key in self._entries:
+                self.index.add(key, geometry)
+
+    def _remove(self, key):
+        super()._remove(key)
+        self.index.discard(key)
+
+    def clear(self):
+        super().clear()
+        self.index = SpatialIndex()
+
+    def invalidate(self, geometry, predicate="intersects") -> int:
+        """Видаляє записи, чия геометрія задовольняє predicate щодо geometry"""
+        self.index.prune(self.__contains__)
+
+        removed = 0
+        for key in self.index.query(geometry, predicate):
+            if self.pop(key) is not None:
+                removed += 1
+
+        with self._lock:
+            self.invalidations += removed
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "indexed": len(self.index),
+            "invalidations": self.invalidations,
+        }
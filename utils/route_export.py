@@ -0,0 +1,282 @@
+from xml.sax.saxutils import escape, quoteattr
+
+import orjson
+from sqlmodel import Session, select
+
+from models.route import Route
+
+# Скільки точок маршруту форматувати за один шматок потоку
+CHUNK_POINTS = 2000
+
+EXPORT_FORMATS = {
+    "txt": ("text/plain; charset=utf-8", "txt"),
+    "gpx": ("application/gpx+xml", "gpx"),
+    "geojson": ("application/geo+json", "geojson"),
+    "kml": ("application/vnd.google-earth.kml+xml", "kml"),
+}
+
+
+def stored_route_export(data: dict, name=None) -> dict:
+    """Маршрут з ROUTE_STORE у вигляді для експорту"""
+    return {
+        "name": name,
+        "total_distance": data["total_distance"],
+        "route_coords": data["route_coords"],
+        "waypoints": _waypoints(
+            data["start_point"],
+            data["end_point"],
+            data.get("intermediate_points"),
+            data.get("start_point_name"),
+            data.get("end_point_name"),
+            data.get("intermediate_point_names"),
+        ),
+    }
+
+
+def saved_route_export(route) -> dict:
+    """Збережений маршрут (models.Route) у вигляді для експорту"""
+    return {
+        "name": route.name,
+        "total_distance": route.total_distance,
+        "route_coords": route.route_coords,
+        "waypoints": _waypoints(
+            route.start_point,
+            route.end_point,
+            route.intermediate_points,
+            route.start_point_name,
+            route.end_point_name,
+            route.intermediate_point_names,
+        ),
+    }
+
+
+def _waypoints(start, end, intermediate, start_name, end_name, intermediate_names):
+    """[(lat, lon, назва)] — початок, проміжні точки, кінець"""
+    intermediate = intermediate or []
+    names = list(intermediate_names or [])
+    names += [None] * (len(intermediate) - len(names))
+    points = [start, *intermediate, end]
+    labels = [start_name, *names, end_name]
+    return [(point[0], point[1], label) for point, label in zip(points, labels)]
+
+
+class SavedRoutes:
+    """
+    Збережені маршрути користувача для вивантаження. Список id фіксується
+    при першому обході, далі кожен обхід читає маршрути за цими id пакетами
+    по batch_size, тож у пам'яті лише один пакет, а повторні обходи (GPX)
+    бачать ті самі маршрути в тому ж порядку. Видалені між обходами
+    маршрути пропускаються.
+    """
+
+    def __init__(self, engine, user_id, batch_size=100):
+        self.engine = engine
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self._route_ids = None
+
+    def _load_route_ids(self):
+        statement = (
+            select(Route.id)
+            .where(Route.user_id == self.user_id)
+            .order_by(Route.created_at.desc())
+        )
+        with Session(self.engine) as session:
+            return session.exec(statement).all()
+
+    def __iter__(self):
+        if self._route_ids is None:
+            self._route_ids = self._load_route_ids()
+
+        with Session(self.engine) as session:
+            for start in range(0, len(self._route_ids), self.batch_size):
+                batch = self._route_ids[start : start + self.batch_size]
+                found = {
+                    route.id: route
+                    for route in session.exec(
+                        select(Route)
+                        .where(Route.user_id == self.user_id)
+                        .where(Route.id.in_(batch))
+                    )
+                }
+                for route_id in batch:
+                    if route_id in found:
+                        yield saved_route_export(found[route_id])
+                session.expunge_all()
+
+
+def _chunks(coords):
+    for start in range(0, len(coords), CHUNK_POINTS):
+        yield coords[start : start + CHUNK_POINTS]
+
+
+def _distance_km(route: dict) -> float:
+    return round(route["total_distance"] / 1000, 2)
+
+
+def _name(route: dict) -> str:
+    return escape(route["name"] or "Route")
+
+
+# --- Текст ---
+
+
+def iter_text(routes, settlements=None):
+    """
+    Текстовий опис маршрутів. settlements — список назв пунктів для
+    кожного маршруту (або None, щоб не виводити розділ)
+    """
+    for i, route in enumerate(routes):
+        if i:
+            yield "\n"
+        title = f": {route['name']}" if route["name"] else ""
+        yield (
+            f"Інформація про маршрут{title}\n" f"Відстань: {_distance_km(route)} км\n\n"
+        )
+
+        if settlements is not None:
+            yield "Точки маршруту:\n"
+            if settlements[i]:
+                yield "".join(
+                    f"{n}. {settlement}\n"
+                    for n, settlement in enumerate(settlements[i], 1)
+                )
+            else:
+                yield "Немає інформації про міста\n"
+
+        yield "\nКоординати точок маршруту:\n"
+        number = 1
+        for chunk in _chunks(route["route_coords"]):
+            yield "".join(
+                f"{n}. [{lat}, {lon}]\n" for n, (lat, lon) in enumerate(chunk, number)
+            )
+            number += len(chunk)
+
+
+# --- GPX ---
+
+
+def iter_gpx(routes):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="GraphMap" '
+        'xmlns="http://www.topografix.com/GPX/1/1">\n'
+    )
+
+    # GPX вимагає, щоб усі wpt йшли перед trk
+    for route in routes:
+        for lat, lon, label in route["waypoints"]:
+            yield f'  <wpt lat="{lat}" lon="{lon}">'
+            if label:
+                yield f"<name>{escape(label)}</name>"
+            yield "</wpt>\n"
+
+    for route in routes:
+        yield (
+            f"  <trk>\n    <name>{_name(route)}</name>\n"
+            f"    <desc>{_distance_km(route)} km</desc>\n    <trkseg>\n"
+        )
+        for chunk in _chunks(route["route_coords"]):
+            yield "".join(
+                f'      <trkpt lat="{lat}" lon="{lon}"/>\n' for lat, lon in chunk
+            )
+        yield "    </trkseg>\n  </trk>\n"
+
+    yield "</gpx>\n"
+
+
+# --- KML ---
+
+
+def iter_kml(routes):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<kml xmlns="http://www.opengis.net/kml/2.2">\n<Document>\n'
+    )
+
+    for route in routes:
+        for lat, lon, label in route["waypoints"]:
+            yield "  <Placemark>"
+            if label:
+                yield f"<name>{escape(label)}</name>"
+            yield f"<Point><coordinates>{lon},{lat}</coordinates></Point></Placemark>\n"
+
+        yield (
+            f"  <Placemark>\n    <name>{_name(route)}</name>\n"
+            f"    <description>{_distance_km(route)} km</description>\n"
+            "    <LineString>\n      <coordinates>\n"
+        )
+        for chunk in _chunks(route["route_coords"]):
+            yield "".join(f"        {lon},{lat}\n" for lat, lon in chunk)
+        yield "      </coordinates>\n    </LineString>\n  </Placemark>\n"
+
+    yield "</Document>\n</kml>\n"
+
+
+# --- GeoJSON ---
+
+
+def _geojson_feature(route):
+    properties = orjson.dumps(
+        {
+            "name": route["name"],
+            "distance_km": _distance_km(route),
+            "waypoints": [
+                {"lat": lat, "lon": lon, "name": label}
+                for lat, lon, label in route["waypoints"]
+            ],
+        }
+    ).decode()
+    yield (
+        '{"type":"Feature","properties":'
+        f"{properties}"
+        ',"geometry":{"type":"LineString","coordinates":['
+    )
+
+    # Координати GeoJSON — [lon, lat]
+    first = True
+    for chunk in _chunks(route["route_coords"]):
+        body = orjson.dumps([[lon, lat] for lat, lon in chunk]).decode()[1:-1]
+        if body:
+            yield body if first else f",{body}"
+            first = False
+
+    yield "]}}"
+
+
+def iter_geojson(routes):
+    """FeatureCollection: по одному Feature (LineString) на маршрут"""
+    yield '{"type":"FeatureCollection","features":['
+    for i, route in enumerate(routes):
+        if i:
+            yield ","
+        yield from _geojson_feature(route)
+    yield "]}\n"
+
+
+EXPORTERS = {"gpx": iter_gpx, "geojson": iter_geojson, "kml": iter_kml}
+
+
+def iter_export(routes, export_format: str, settlements=None):
+    """
+    Потік шматків файлу (str) у запитаному форматі. Маршрути форматуються
+    по одному, тож пам'ять не росте з розміром вивантаження. GPX вимагає
+    всі wpt перед trk, тому routes для нього обходиться двічі — це має
+    бути повторно ітерований об'єкт з однаковим вмістом (список або
+    SavedRoutes), а не генератор.
+    """
+    if export_format == "txt":
+        return iter_text(routes, settlements)
+    return EXPORTERS[export_format](routes)
+
+
+def encode_chunks(chunks):
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def export_headers(export_format: str, filename: str):
+    """(media type, заголовки) для StreamingResponse з файлом"""
+    media_type, extension = EXPORT_FORMATS[export_format]
+    disposition = f"attachment; filename={quoteattr(f'{filename}.{extension}')}"
+    return media_type, {"Content-Disposition": disposition}
@@ -0,0 +1,199 @@
+import itertools
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.path_search import alt_edges, dijkstra_edges
+
+logger = logging.getLogger(__name__)
+
+# Граф для пошуку і таблиця ориентирів: у головному процесі — CompactGraph,
+# у воркерах — подання тих самих масивів у спільній пам'яті
+_COMPACT_GRAPH = None
+_LANDMARK_TABLE = None
+_EXECUTOR = None
+# Блоки спільної пам'яті: у головному процесі — щоб звільнити при зупинці,
+# у воркерах — щоб масиви лишались дійсними
+_SHARED_BLOCKS = []
+
+# Таблиці заблокованих вузлів у воркері: будуються раз на маску запиту
+# (token), а не на кожен сегмент; кілька останніх — для паралельних запитів
+_BLOCKED_LOOKUPS = OrderedDict()
+BLOCKED_LOOKUP_CACHE_SIZE = 8
+_MASK_TOKENS = itertools.count()
+
+
+class SharedSearchGraph:
+    """Масиви компактного графа, потрібні циклу пошуку (search_arrays)"""
+
+    def __init__(self, indptr, heads, tails, lengths):
+        self.num_nodes = len(indptr) - 1
+        self.search_arrays = (
+            memoryview(indptr),
+            memoryview(heads),
+            memoryview(tails),
+            memoryview(lengths),
+        )
+
+
+def _share(array):
+    """Копія масиву у новому блоці спільної пам'яті: (блок, опис для воркера)"""
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    _SHARED_BLOCKS.append(block)
+    return np.ndarray(shape, dtype, buffer=block.buf)
+
+
+def _init_worker(graph_specs, landmark_spec):
+    """Ініціалізатор воркера: підключає масиви графа зі спільної пам'яті"""
+    global _COMPACT_GRAPH, _LANDMARK_TABLE
+
+    _COMPACT_GRAPH = SharedSearchGraph(*(_attach(spec) for spec in graph_specs))
+    _LANDMARK_TABLE = _attach(landmark_spec)
+
+
+def _ready():
+    return True
+
+
+def init_leg_pool(compact_graph, landmark_table, max_workers: int):
+    """
+    Ініціалізує пул для паралельного пошуку сегментів маршруту. Масиви
+    пошуку копіюються у спільну пам'ять один раз; воркери запускаються
+    через forkserver/spawn (без fork багатопотокового процесу) і одразу,
+    а не при першому запиті.
+    """
+    global _COMPACT_GRAPH, _LANDMARK_TABLE, _EXECUTOR
+
+    _COMPACT_GRAPH = compact_graph
+    _LANDMARK_TABLE = landmark_table
+
+    if max_workers <= 1:
+        _EXECUTOR = None
+        return
+
+    graph_specs = []
+    for array in (
+        compact_graph.indptr,
+        compact_graph.heads,
+        compact_graph.tails,
+        compact_graph.lengths,
+    ):
+        block, spec = _share(array)
+        _SHARED_BLOCKS.append(block)
+        graph_specs.append(spec)
+    block, landmark_spec = _share(landmark_table)
+    _SHARED_BLOCKS.append(block)
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+    _EXECUTOR = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(graph_specs, landmark_spec),
+    )
+    # Пул створює воркерів по мірі надходження задач — запускаємо всіх зараз
+    wait([_EXECUTOR.submit(_ready) for _ in range(max_workers)])
+
+    logger.info(f"Route leg pool started with {max_workers} workers")
+
+
+def shutdown_leg_pool():
+    global _EXECUTOR
+
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(cancel_futures=True)
+        _EXECUTOR = None
+
+    while _SHARED_BLOCKS:
+        block = _SHARED_BLOCKS.pop()
+        block.close()
+        block.unlink()
+
+
+def blocked_lookup(blocked_indices):
+    """Швидка для циклу пошуку таблиця заблокованих вузлів"""
+    if blocked_indices is None or len(blocked_indices) == 0:
+        return None
+
+    blocked = np.zeros(_COMPACT_GRAPH.num_nodes, dtype=np.uint8)
+    blocked[blocked_indices] = 1
+    return memoryview(blocked)
+
+
+def _cached_blocked_lookup(token, blocked_indices):
+    lookup = _BLOCKED_LOOKUPS.get(token)
+    if lookup is None:
+        lookup = blocked_lookup(blocked_indices)
+        _BLOCKED_LOOKUPS[token] = lookup
+        if len(_BLOCKED_LOOKUPS) > BLOCKED_LOOKUP_CACHE_SIZE:
+            _BLOCKED_LOOKUPS.popitem(last=False)
+    else:
+        _BLOCKED_LOOKUPS.move_to_end(token)
+    return lookup
+
+
+def solve_leg(algorithm: str, source: int, target: int, blocked=None):
+    """
+    Шлях між двома вузлами (індекси компактного графа) на спільному графі:
+    (масив id ребер, довжина) або None, якщо шляху немає. blocked — таблиця
+    з blocked_lookup.
+    """
+    if algorithm == "dijkstra":
+        return dijkstra_edges(_COMPACT_GRAPH, source, target, blocked)
+
+    if algorithm == "alt":
+        return alt_edges(_COMPACT_GRAPH, source, target, _LANDMARK_TABLE, blocked)
+
+    raise ValueError(f"Unknown algorithm: {algorithm}")
+
+
+def _solve_leg_in_worker(algorithm, source, target, token, blocked_indices):
+    blocked = _cached_blocked_lookup(token, blocked_indices)
+    return solve_leg(algorithm, source, target, blocked)
+
+
+def iter_legs(algorithm: str, legs, blocked_mask=None):
+    """
+    Одразу запускає пошук усіх незалежних сегментів паралельно і віддає
+    результати в тому ж порядку, щойно кожен готовий.
+    """
+    if blocked_mask is None or not blocked_mask.any():
+        blocked_mask = None
+
+    if _EXECUTOR is None or len(legs) < 2:
+        # Одна таблиця на всі сегменти запиту
+        blocked = (
+            memoryview(blocked_mask.view(np.uint8))
+            if blocked_mask is not None
+            else None
+        )
+        return (solve_leg(algorithm, u, v, blocked) for u, v in legs)
+
+    # Воркерам передаємо лише індекси заблокованих вузлів, а не всю маску;
+    # таблицю кожен воркер будує раз на token
+    token = next(_MASK_TOKENS)
+    blocked_indices = (
+        np.flatnonzero(blocked_mask).astype(np.int32)
+        if blocked_mask is not None
+        else None
+    )
+    futures = [
+        _EXECUTOR.submit(_solve_leg_in_worker, algorithm, u, v, token, blocked_indices)
+        for u, v in legs
+    ]
+    return (future.result() for future in futures)
@@ -0,0 +1,141 @@
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+import redis
+
+from utils.route_cache import BoundedCache
+
+# Поля маршруту, що зберігаються як бінарні масиви, а не JSON
+ROUTE_NODES_FIELD = "full_route"
+ROUTE_COORDS_FIELD = "route_coords"
+
+_HEADER = struct.Struct("<4sIII")
+_MAGIC = b"GMR1"
+
+
+def pack_route(route: dict) -> bytes:
+    """
+    Компактна серіалізація маршруту: метадані в JSON, вузли як int64,
+    координати як float64, все стиснуто zlib.
+    """
+    meta = {
+        key: value
+        for key, value in route.items()
+        if key not in (ROUTE_NODES_FIELD, ROUTE_COORDS_FIELD)
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    nodes = np.asarray(route.get(ROUTE_NODES_FIELD, []), dtype=np.int64)
+    coords = np.asarray(route.get(ROUTE_COORDS_FIELD, []), dtype=np.float64)
+
+    payload = b"".join(
+        [
+            _HEADER.pack(_MAGIC, len(meta_bytes), len(nodes), len(coords)),
+            meta_bytes,
+            nodes.tobytes(),
+            coords.tobytes(),
+        ]
+    )
+    return zlib.compress(payload, 1)
+
+
+def unpack_route(data: bytes) -> dict:
+    payload = zlib.decompress(data)
+    magic, meta_len, n_nodes, n_coords = _HEADER.unpack_from(payload)
+    if magic != _MAGIC:
+        raise ValueError("Unknown route payload format")
+
+    offset = _HEADER.size
+    route = json.loads(payload[offset : offset + meta_len])
+    offset += meta_len
+
+    nodes = np.frombuffer(payload, dtype=np.int64, count=n_nodes, offset=offset)
+    offset += nodes.nbytes
+    coords = np.frombuffer(payload, dtype=np.float64, count=n_coords * 2, offset=offset)
+
+    route[ROUTE_NODES_FIELD] = nodes.tolist()
+    route[ROUTE_COORDS_FIELD] = coords.reshape(-1, 2).tolist()
+    return route
+
+
+class RouteStore(ABC):
+    """Сховище обчислених маршрутів, доступних клієнту по route_id"""
+
+    backend = "base"
+
+    @abstractmethod
+    def get(self, route_id: str) -> dict | None:
+        """Маршрут за route_id або None, якщо його немає чи строк минув"""
+
+    @abstractmethod
+    def put(self, route_id: str, route: dict):
+        """Зберігає маршрут на ttl_seconds"""
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+
+class InMemoryRouteStore(RouteStore):
+    """Сховище в пам'яті процесу (лише для одного воркера)"""
+
+    backend = "memory"
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self._cache = BoundedCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    def get(self, route_id):
+        return self._cache.get(route_id)
+
+    def put(self, route_id, route):
+        self._cache.put(route_id, route)
+
+    def stats(self):
+        return {"backend": self.backend, **self._cache.stats()}
+
+
+class RedisRouteStore(RouteStore):
+    """Спільне сховище в Redis для кількох воркерів і хостів"""
+
+    backend = "redis"
+    key_prefix = "graphmap:route:"
+
+    def __init__(self, client, ttl_seconds: int):
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, route_id):
+        data = self._client.get(self.key_prefix + route_id)
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return unpack_route(data)
+
+    def put(self, route_id, route):
+        self._client.set(
+            self.key_prefix + route_id, pack_route(route), ex=self.ttl_seconds
+        )
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def create_route_store(url: str, max_bytes: int, ttl_seconds: int) -> RouteStore:
+    """Створює сховище за URL: memory:// або redis://, rediss://, unix://"""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRouteStore(redis.Redis.from_url(url), ttl_seconds=ttl_seconds)
+
+    if url.startswith("memory://"):
+        return InMemoryRouteStore(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    raise ValueError(f"Unsupported route store URL: {url}")
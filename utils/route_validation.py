@@ -0,0 +1,172 @@
+import logging
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+import shapely
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from models.route import Route
+from models.threat import Threat
+
+logger = logging.getLogger(__name__)
+
+# Стан фонових перевірок за job_id (останні MAX_JOBS)
+VALIDATION_JOBS = {}
+MAX_JOBS = 20
+_jobs_lock = threading.Lock()
+
+
+class ThreatIndex:
+    """Підготовлені полігони актуальних загроз у STRtree"""
+
+    def __init__(self, threats):
+        self.ids = [str(threat.id) for threat in threats]
+        self.points = [
+            [[loc["lat"], loc["lng"]] for loc in threat.location] for threat in threats
+        ]
+        polygons = [
+            shapely.polygons([(lng, lat) for lat, lng in points])
+            for points in self.points
+        ]
+        shapely.prepare(polygons)
+        self.tree = shapely.STRtree(polygons)
+
+    @classmethod
+    def load(cls, session: Session):
+        return cls(session.exec(select(Threat)).all())
+
+    def affected(self, route_coords_batch):
+        """
+        Для кожного маршруту пакета — список id загроз, які перетинає його
+        лінія. Усі лінії пакета перевіряються одним запитом до дерева.
+        """
+        affected = [[] for _ in route_coords_batch]
+        lines, owners = [], []
+        for i, coords in enumerate(route_coords_batch):
+            if coords and len(coords) >= 2:
+                lines.append(np.asarray(coords, dtype=np.float64)[:, ::-1])
+                owners.append(i)
+
+        if not lines or not self.ids:
+            return affected
+
+        route_index, threat_index = self.tree.query(
+            shapely.linestrings(
+                np.concatenate(lines),
+                indices=np.repeat(np.arange(len(lines)), [len(line) for line in lines]),
+            ),
+            predicate="intersects",
+        )
+        for i, j in zip(route_index.tolist(), threat_index.tolist()):
+            affected[owners[i]].append(self.ids[j])
+        return affected
+
+
+def new_validation_job(recompute: bool) -> dict:
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "status": "running",
+        "recompute": recompute,
+        "processed": 0,
+        "affected": 0,
+        "recomputed": 0,
+        "errors": 0,
+        "started_at": datetime.utcnow().isoformat(),
+        "finished_at": None,
+    }
+    with _jobs_lock:
+        VALIDATION_JOBS[job["job_id"]] = job
+        while len(VALIDATION_JOBS) > MAX_JOBS:
+            VALIDATION_JOBS.pop(next(iter(VALIDATION_JOBS)))
+    return job
+
+
+def running_validation_job():
+    with _jobs_lock:
+        return next(
+            (job for job in VALIDATION_JOBS.values() if job["status"] == "running"),
+            None,
+        )
+
+
+def revalidate_saved_routes(engine, job: dict, recompute=None, batch_size=500):
+    """
+    Перевіряє всі збережені маршрути на перетин з актуальними загрозами.
+
+    Маршрути читаються потоком пакетами по batch_size (yield_per, серверний
+    курсор) — у пам'яті лише id та координати одного пакета. Результат
+    записується окремою сесією одним bulk UPDATE на пакет.
+
+    recompute(route, threat_points) -> dict | None — необов'язкове
+    перерахування зачеплених маршрутів (поля для оновлення Route).
+    """
+    try:
+        with Session(engine) as read_session, Session(engine) as write_session:
+            threats = ThreatIndex.load(read_session)
+            rows = read_session.exec(
+                select(Route.id, Route.route_coords).execution_options(
+                    yield_per=batch_size
+                )
+            )
+
+            for batch in rows.partitions():
+                ids = [row[0] for row in batch]
+                affected = threats.affected([row[1] for row in batch])
+                checked_at = datetime.utcnow()
+
+                write_session.execute(
+                    update(Route),
+                    [
+                        {
+                            "id": route_id,
+                            "threat_status": "affected" if threat_ids else "clear",
+                            "affected_threat_ids": threat_ids,
+                            "threat_checked_at": checked_at,
+                        }
+                        for route_id, threat_ids in zip(ids, affected)
+                    ],
+                )
+
+                affected_ids = [rid for rid, tids in zip(ids, affected) if tids]
+                if recompute and affected_ids:
+                    _recompute_routes(
+                        write_session, affected_ids, threats, recompute, job
+                    )
+
+                write_session.commit()
+                job["processed"] += len(ids)
+                job["affected"] += len(affected_ids)
+
+        job["status"] = "finished"
+    except Exception as e:
+        logger.error(f"Route re-validation failed: {e}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = datetime.utcnow().isoformat()
+
+
+def _recompute_routes(
+    session: Session, route_ids, threats: ThreatIndex, recompute, job
+):
+    routes = session.exec(select(Route).where(Route.id.in_(route_ids))).all()
+
+    for route in routes:
+        try:
+            fields = recompute(route, threats.points)
+        except Exception as e:
+            logger.warning(f"Route {route.id} recompute failed: {e}")
+            fields = None
+
+        if fields is None:
+            job["errors"] += 1
+            continue
+
+        for key, value in fields.items():
+            setattr(route, key, value)
+        route.threat_status = "recomputed"
+        route.affected_threat_ids = []
+        job["recomputed"] += 1
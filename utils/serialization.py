@@ -0,0 +1,70 @@
+import struct
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Координати маршруту як float32 [lat, lon, lat, lon, ...] з коротким заголовком:
+# magic, кількість вершин, довжина JSON з рештою полів відповіді
+ROUTE_BUFFER_MEDIA_TYPE = "application/vnd.graphmap.route"
+_BUFFER_HEADER = struct.Struct("<4sII")
+_BUFFER_MAGIC = b"GMF1"
+
+
+def pack_route_buffer(content: dict, coords_key: str) -> bytes:
+    """
+    Заголовок + JSON з усіма полями, крім геометрії, + координати float32.
+    Якщо геометрія вже закодована (polyline), вона лишається в JSON.
+    """
+    coords = content.get(coords_key)
+    if isinstance(coords, str):
+        coords = []
+    else:
+        content = {key: value for key, value in content.items() if key != coords_key}
+
+    coords = np.asarray(coords, dtype="<f4").reshape(-1, 2)
+    meta = orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return (
+        _BUFFER_HEADER.pack(_BUFFER_MAGIC, len(coords), len(meta))
+        + meta
+        + coords.tobytes()
+    )
+
+
+def unpack_route_buffer(data: bytes, coords_key: str) -> dict:
+    """Зворотне до pack_route_buffer: поля відповіді, геометрія — масив (n, 2)"""
+    magic, n_coords, meta_len = _BUFFER_HEADER.unpack_from(data)
+    if magic != _BUFFER_MAGIC:
+        raise ValueError("Unknown route buffer format")
+
+    offset = _BUFFER_HEADER.size
+    content = orjson.loads(data[offset : offset + meta_len])
+    if coords_key not in content:
+        coords = np.frombuffer(
+            data, dtype="<f4", count=n_coords * 2, offset=offset + meta_len
+        )
+        content[coords_key] = coords.reshape(-1, 2)
+    return content
+
+
+def route_response(request: Request, content: dict, coords_key: str) -> Response:
+    """
+    Відповідь з маршрутом у форматі за заголовком Accept: msgpack, буфер
+    float32 або JSON (orjson, без проходу jsonable_encoder).
+    """
+    accept = request.headers.get("accept", "")
+
+    if ROUTE_BUFFER_MEDIA_TYPE in accept:
+        return Response(
+            pack_route_buffer(content, coords_key),
+            media_type=ROUTE_BUFFER_MEDIA_TYPE,
+        )
+
+    if any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+        return Response(msgpack.packb(content), media_type=MSGPACK_MEDIA_TYPES[0])
+
+    return ORJSONResponse(content)
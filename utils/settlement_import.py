@@ -0,0 +1,181 @@
+"""
+Імпорт населених пунктів з дампу GeoNames (cities.txt, allCountries.txt ...)
+у таблицю settlements.
+
+    python -m utils.settlement_import cities.txt --chunk-size 5000
+    python -m utils.settlement_import allCountries.txt --country UA --country MD
+
+Файл читається потоком, рядки пишуться пакетами через INSERT ... ON CONFLICT
+(geoname_id) DO UPDATE, тож повторний запуск оновлює дані без очищення
+таблиці. За замовчуванням імпортуються лише населені пункти
+(VALID_SETTLEMENT_TYPES) України; --all-types і --all-countries вимикають
+ці фільтри.
+"""
+
+import argparse
+import csv
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert
+
+from config.database import DATABASE_URL
+from models.settlement import Settlement
+from utils.db_utils import VALID_SETTLEMENT_TYPES
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_COUNTRIES = ("UA",)
+
+# Поля дампу GeoNames (розділені табуляцією)
+GEONAME_ID, NAME, ALTERNATE_NAMES, LAT, LON = 0, 1, 3, 4, 5
+FEATURE_CODE, COUNTRY_CODE, POPULATION = 7, 8, 14
+
+
+def iter_settlement_rows(
+    file, feature_codes=VALID_SETTLEMENT_TYPES, countries=DEFAULT_COUNTRIES, counts=None
+):
+    """
+    Рядки дампу як словники для вставки. Рядки з іншими кодами об'єктів чи
+    країнами (None — без фільтра) пропускаються, некоректні — теж; їх
+    кількість рахується в counts["skipped"] і counts["malformed"].
+    """
+    counts = counts if counts is not None else Counter()
+    feature_codes = set(feature_codes) if feature_codes is not None else None
+    countries = set(countries) if countries is not None else None
+
+    csv.field_size_limit(sys.maxsize)
+    # Назви в GeoNames можуть містити лапки — без обробки лапок
+    for row in csv.reader(file, delimiter="\t", quoting=csv.QUOTE_NONE):
+        try:
+            feature_code = row[FEATURE_CODE]
+            # Рядки без коду країни не проходять фільтр за країнами; без
+            # фільтра зберігаються з порожнім кодом, а не як UA
+            country = row[COUNTRY_CODE]
+            if (feature_codes is not None and feature_code not in feature_codes) or (
+                countries is not None and country not in countries
+            ):
+                counts["skipped"] += 1
+                continue
+
+            yield {
+                "geoname_id": int(row[GEONAME_ID]),
+                "name": row[NAME],
+                "lat": float(row[LAT]),
+                "lon": float(row[LON]),
+                "type": feature_code,
+                "country": country,
+                "population": int(row[POPULATION] or 0) if len(row) > POPULATION else 0,
+                "alternate_names": [
+                    name for name in row[ALTERNATE_NAMES].split(",") if name
+                ],
+            }
+        except (IndexError, ValueError):
+            counts["malformed"] += 1
+
+
+def iter_chunks(rows, chunk_size: int):
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def upsert_statement():
+    statement = insert(Settlement.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=[Settlement.geoname_id],
+        set_={
+            column: statement.excluded[column]
+            for column in (
+                "name",
+                "lat",
+                "lon",
+                "type",
+                "country",
+                "population",
+                "alternate_names",
+            )
+        },
+    )
+
+
+def import_settlements(
+    engine,
+    path: str,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    report=print,
+    feature_codes=VALID_SETTLEMENT_TYPES,
+    countries=DEFAULT_COUNTRIES,
+):
+    """
+    Потоковий імпорт: кожен пакет — один executemany-upsert в окремій
+    транзакції, після нього — звіт про прогрес. Повертає Counter з
+    кількістю імпортованих, пропущених фільтрами і некоректних рядків.
+    """
+    statement = upsert_statement()
+    counts = Counter(imported=0, skipped=0, malformed=0)
+    started = time.monotonic()
+
+    with open(path, "r", encoding="utf-8") as file:
+        rows = iter_settlement_rows(file, feature_codes, countries, counts)
+        for chunk in iter_chunks(rows, chunk_size):
+            # Дублікати geoname_id в одному пакеті ON CONFLICT не допускає
+            chunk = list({row["geoname_id"]: row for row in chunk}.values())
+            with engine.begin() as connection:
+                connection.execute(statement, chunk)
+
+            counts["imported"] += len(chunk)
+            elapsed = time.monotonic() - started
+            report(
+                f"Imported {counts['imported']} settlements "
+                f"({counts['imported'] / max(elapsed, 1e-9):.0f} rows/s), "
+                f"skipped {counts['skipped']}, malformed {counts['malformed']}"
+            )
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import GeoNames settlements")
+    parser.add_argument("path", nargs="?", default="cities.txt")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument(
+        "--country",
+        action="append",
+        dest="countries",
+        help="ISO country code to import, repeatable (default: UA)",
+    )
+    parser.add_argument(
+        "--all-countries", action="store_true", help="do not filter by country"
+    )
+    parser.add_argument(
+        "--all-types",
+        action="store_true",
+        help="import every feature, not only populated places",
+    )
+    args = parser.parse_args(argv)
+
+    countries = None if args.all_countries else args.countries or DEFAULT_COUNTRIES
+    feature_codes = None if args.all_types else VALID_SETTLEMENT_TYPES
+
+    # Без echo: логування кожного INSERT сповільнює імпорт у рази
+    engine = create_engine(args.database_url, echo=False)
+    counts = import_settlements(
+        engine,
+        args.path,
+        args.chunk_size,
+        feature_codes=feature_codes,
+        countries=countries,
+    )
+    print(
+        f"Done: {counts['imported']} settlements imported, "
+        f"{counts['skipped']} rows skipped by filters, "
+        f"{counts['malformed']} malformed rows."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import hashlib
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from utils.polyline import METERS_PER_DEGREE
+
+EARTH_RADIUS_KM = 6371
+
+
+def _unit_vectors(lats, lons):
+    """Точки на одиничній сфері: евклідова відстань між ними — хорда"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def sample_along(coords, spacing_m: float):
+    """
+    Точки через кожні spacing_m метрів уздовж лінії [[lat, lon], ...] (разом
+    з кінцями) і їхні відстані від початку лінії в метрах
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(coords) == 0:
+        return coords, np.empty(0)
+
+    mid_lat = np.radians((coords[1:, 0] + coords[:-1, 0]) / 2)
+    steps = np.hypot(np.diff(coords[:, 0]), np.diff(coords[:, 1]) * np.cos(mid_lat))
+    cumulative = np.concatenate(([0.0], np.cumsum(steps * METERS_PER_DEGREE)))
+
+    positions = np.append(np.arange(0, cumulative[-1], spacing_m), cumulative[-1])
+    points = np.column_stack(
+        (
+            np.interp(positions, cumulative, coords[:, 0]),
+            np.interp(positions, cumulative, coords[:, 1]),
+        )
+    )
+    return points, positions
+
+
+class SettlementIndex:
+    """
+    KD-дерево населених пунктів у пам'яті. Будується один раз при старті;
+    пошук найближчого в радіусі для всіх точок — один векторизований запит.
+    """
+
+    def __init__(self, names, lats, lons):
+        self.names = np.asarray(names, dtype=object)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.tree = cKDTree(_unit_vectors(self.lats, self.lons)) if len(names) else None
+        self._fingerprint = None
+
+    @classmethod
+    def from_settlements(cls, settlements):
+        """Індекс з рядків settlements (див. load_valid_settlements)"""
+        return cls(
+            [s.name for s in settlements],
+            [s.lat for s in settlements],
+            [s.lon for s in settlements],
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Хеш назв і координат у порядку індексу: змінюється після кожного
+        імпорту, що додав, прибрав чи змінив пункти
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1("\0".join(self.names.tolist()).encode("utf-8"))
+            digest.update(self.lats.tobytes())
+            digest.update(self.lons.tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def nearest_indices(self, lats, lons, radius_km: float = 10):
+        """Індекси найближчих пунктів у межах radius_km; -1 — немає жодного"""
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        if self.tree is None:
+            return np.full(len(lats), -1, dtype=np.int64)
+
+        # Дуга radius_km відповідає хорді 2 * sin(d / 2R) на одиничній сфері
+        chord = 2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2)
+        distances, indices = self.tree.query(
+            _unit_vectors(lats, lons), distance_upper_bound=chord * (1 + 1e-12)
+        )
+        return np.where(np.isfinite(distances), indices, -1).astype(np.int64)
+
+    def nearest(self, lats, lons, radius_km: float = 10):
+        """Назви найближчих пунктів у межах radius_km (None — немає жодного)"""
+        indices = self.nearest_indices(lats, lons, radius_km)
+        return [self.names[i] if i >= 0 else None for i in indices.tolist()]
+
+
+class NodeSettlements:
+    """
+    Найближчий населений пункт для кожного вузла графа, обчислений один раз
+    при збірці: table[i] — індекс у names або -1. Зберігається поруч з .pkl
+    графа і перебудовується для нової версії графа, іншого радіуса чи
+    зміненої таблиці settlements (fingerprint індексу пунктів).
+    """
+
+    def __init__(
+        self, names, table, graph_version: str, radius_km: float, fingerprint: str
+    ):
+        self.names = np.asarray(names, dtype=str)
+        self.table = np.asarray(table, dtype=np.int32)
+        self.graph_version = graph_version
+        self.radius_km = float(radius_km)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, compact_graph, settlement_index, graph_version, radius_km):
+        table = settlement_index.nearest_indices(
+            compact_graph.ys, compact_graph.xs, radius_km
+        )
+        return cls(
+            settlement_index.names,
+            table,
+            graph_version,
+            radius_km,
+            settlement_index.fingerprint,
+        )
+
+    @classmethod
+    def load(cls, path: str, graph_version: str, radius_km: float, fingerprint: str):
+        """Таблиця з файлу або None, якщо файлу немає чи він застарів"""
+        try:
+            with np.load(path) as data:
+                if (
+                    str(data["graph_version"]) != graph_version
+                    or float(data["radius_km"]) != radius_km
+                    or str(data["fingerprint"]) != fingerprint
+                ):
+                    return None
+                return cls(
+                    data["names"], data["table"], graph_version, radius_km, fingerprint
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            names=self.names,
+            table=self.table,
+            graph_version=np.array(self.graph_version),
+            radius_km=np.array(self.radius_km),
+            fingerprint=np.array(self.fingerprint),
+        )
+
+
+def load_node_settlements(
+    path: str, compact_graph, settlement_index, graph_version: str, radius_km: float
+):
+    """
+    Таблиця вузол -> пункт з файлу поруч із графом; якщо її немає чи вона
+    застаріла — будується з індексу пунктів і зберігається
+    """
+    node_settlements = NodeSettlements.load(
+        path, graph_version, radius_km, settlement_index.fingerprint
+    )
+    if node_settlements is not None:
+        print("Node settlements loaded from .npz file.")
+        return node_settlements
+
+    node_settlements = NodeSettlements.build(
+        compact_graph, settlement_index, graph_version, radius_km
+    )
+    # Без пунктів у БД таблиця порожня — не зберігаємо, щоб не закешувати її
+    if len(settlement_index):
+        node_settlements.save(path)
+        print("Node settlements saved to .npz file.")
+    return node_settlements
@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+
+def to_geometry(geometry):
+    """shapely-геометрія як є або лінія з координат [[lat, lon], ...]; None — порожня"""
+    if isinstance(geometry, BaseGeometry):
+        return geometry
+
+    coords = np.asarray(geometry, dtype=np.float64).reshape(-1, 2)
+    if len(coords) == 0:
+        return None
+    if len(coords) == 1:
+        return shapely.points(coords[0, ::-1])
+    return shapely.linestrings(coords[:, ::-1])
+
+
+class SpatialIndex:
+    """
+    R-дерево (shapely STRtree) над геометріями ключів. STRtree незмінне, тож
+    додавання й видалення лише позначають індекс застарілим, а дерево
+    перебудовується при наступному запиті.
+    """
+
+    def __init__(self):
+        self._geometries = {}
+        self._tree = None
+        self._tree_keys = []
+        self._lock = threading.Lock()
+
+    def add(self, key, geometry):
+        geometry = to_geometry(geometry)
+        with self._lock:
+            if geometry is None:
+                self._geometries.pop(key, None)
+            else:
+                self._geometries[key] = geometry
+            self._tree = None
+
+    def discard(self, key):
+        with self._lock:
+            if self._geometries.pop(key, None) is not None:
+                self._tree = None
+
+    def prune(self, alive):
+        """Прибирає ключі, яких уже немає (витіснені або прострочені записи)"""
+        # alive викликається поза замком: він може брати замок власника індексу
+        with self._lock:
+            keys = list(self._geometries)
+        stale = [key for key in keys if not alive(key)]
+
+        with self._lock:
+            for key in stale:
+                self._geometries.pop(key, None)
+            if stale:
+                self._tree = None
+
+    def query(self, geometry, predicate="intersects"):
+        """
+        Ключі, геометрії яких задовольняють predicate щодо geometry;
+        predicate=None — лише перетин обмежувальних прямокутників.
+        """
+        with self._lock:
+            if self._tree is None:
+                self._tree_keys = list(self._geometries)
+                self._tree = shapely.STRtree(
+                    [self._geometries[key] for key in self._tree_keys]
+                )
+            hits = self._tree.query(geometry, predicate=predicate)
+            return [self._tree_keys[i] for i in hits]
+
+    def __len__(self):
+        return len(self._geometries)
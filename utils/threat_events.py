@@ -0,0 +1,130 @@
+import json
+import logging
+import time
+import uuid
+
+import redis
+from shapely.geometry import Polygon
+
+logger = logging.getLogger(__name__)
+
+# Обробники змін загроз: listener(action, threat_id, points), де action —
+# "created" або "deleted", points — полігон загрози [[lat, lng], ...]
+_LISTENERS = []
+
+# Події інших воркерів приходять через Redis pub/sub і обробляються в потоці
+# підписки; без Redis (memory://) підписники бачать лише зміни, зроблені
+# цим процесом, — це коректно лише з одним воркером
+CHANNEL = "graphmap:threat-events"
+_ORIGIN = uuid.uuid4().hex
+_CLIENT = None
+_SUBSCRIBER = None
+
+
+def subscribe(listener):
+    _LISTENERS.append(listener)
+    return listener
+
+
+def create_event_client(url: str):
+    """Клієнт для розсилки подій за URL: memory:// — None, або redis://, rediss://, unix://"""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return redis.Redis.from_url(url)
+
+    if url.startswith("memory://"):
+        return None
+
+    raise ValueError(f"Unsupported threat events URL: {url}")
+
+
+def start_threat_events(client):
+    """Підписується на події інших воркерів; client=None — лише цей процес"""
+    global _CLIENT, _SUBSCRIBER
+
+    if client is None:
+        logger.warning("Threat events are not shared: run a single worker")
+        return
+
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{CHANNEL: _on_message})
+    _CLIENT = client
+    _SUBSCRIBER = pubsub.run_in_thread(
+        sleep_time=1.0, daemon=True, exception_handler=_on_subscriber_error
+    )
+
+
+def stop_threat_events():
+    global _CLIENT, _SUBSCRIBER
+
+    if _SUBSCRIBER is not None:
+        _SUBSCRIBER.stop()
+        _SUBSCRIBER.join(timeout=5)
+        _SUBSCRIBER = None
+    _CLIENT = None
+
+
+def publish_threat_change(action: str, threat_id, location):
+    """
+    Сповіщає підписників про створення/видалення загрози: у цьому процесі —
+    одразу, в інших воркерах — через Redis. location — поле Threat.location
+    (передається окремо: видалений об'єкт після commit вже недоступний).
+    """
+    points = [[loc["lat"], loc["lng"]] for loc in location]
+    _notify(action, str(threat_id), points)
+
+    if _CLIENT is not None:
+        event = {
+            "origin": _ORIGIN,
+            "action": action,
+            "threat_id": str(threat_id),
+            "points": points,
+        }
+        try:
+            _CLIENT.publish(CHANNEL, json.dumps(event))
+        except redis.RedisError as e:
+            logger.error(f"Failed to publish threat {threat_id} {action}: {e}")
+
+
+def _notify(action: str, threat_id: str, points):
+    for listener in _LISTENERS:
+        try:
+            listener(action, threat_id, points)
+        except Exception as e:
+            logger.error(f"Threat listener {listener.__name__} failed: {e}")
+
+
+def _on_message(message):
+    try:
+        event = json.loads(message["data"])
+        if event["origin"] == _ORIGIN:
+            return
+        action, threat_id, points = event["action"], event["threat_id"], event["points"]
+    except (TypeError, ValueError, KeyError) as e:
+        logger.error(f"Malformed threat event: {e}")
+        return
+
+    _notify(action, threat_id, points)
+
+
+def _on_subscriber_error(error, pubsub, thread):
+    # Потік підписки не зупиняється: redis-py перепідключиться на наступній ітерації
+    logger.error(f"Threat events subscriber error: {error}")
+    time.sleep(1.0)
+
+
+def cache_invalidator(*caches):
+    """
+    Підписник, що видаляє з GeoBoundedCache записи, зачеплені зміною загрози:
+    для нової — ті, чия геометрія перетинає полігон; для видаленої — ті, чий
+    прямокутник перетинається з її прямокутником (маршрут в обхід зони тепер
+    може бути не найкоротшим).
+    """
+
+    def invalidate_cached_routes(action, threat_id, points):
+        polygon = Polygon([(lng, lat) for lat, lng in points])
+        predicate = "intersects" if action == "created" else None
+
+        removed = sum(cache.invalidate(polygon, predicate) for cache in caches)
+        logger.info(f"Threat {threat_id} {action}: {removed} cached entries dropped")
+
+    return invalidate_cached_routes
@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+
+
+def path_cost(matrix, order) -> float:
+    order = np.asarray(order)
+    return float(matrix[order[:-1], order[1:]].sum())
+
+
+def nearest_insertion(matrix):
+    """
+    Початковий порядок відвідування для шляху 0 -> ... -> n-1: щоразу
+    береться найближча до вже побудованого шляху точка і вставляється
+    туди, де вона найменше подовжує шлях.
+    """
+    n = len(matrix)
+    order = [0, n - 1]
+    remaining = list(range(1, n - 1))
+
+    while remaining:
+        nearest = min(
+            remaining,
+            key=lambda k: min(min(matrix[i, k], matrix[k, i]) for i in order),
+        )
+        remaining.remove(nearest)
+
+        tails, heads = np.array(order[:-1]), np.array(order[1:])
+        added = matrix[tails, nearest] + matrix[nearest, heads] - matrix[tails, heads]
+        position = int(np.argmin(added)) + 1
+        order.insert(position, nearest)
+
+    return order
+
+
+def _two_opt_pass(matrix, order, deadline) -> bool:
+    """Розворот відрізка order[i:j] (матриця може бути несиметричною)"""
+    best = path_cost(matrix, order)
+    for i in range(1, len(order) - 2):
+        for j in range(i + 2, len(order)):
+            if time.monotonic() > deadline:
+                return False
+
+            candidate = order[:i] + order[i:j][::-1] + order[j:]
+            cost = path_cost(matrix, candidate)
+            if cost < best - 1e-9:
+                order[:] = candidate
+                return True
+    return False
+
+
+def _or_opt_pass(matrix, order, deadline) -> bool:
+    """Перенесення відрізка з 1-3 точок в інше місце шляху"""
+    best = path_cost(matrix, order)
+    for length in (1, 2, 3):
+        for i in range(1, len(order) - length):
+            segment = order[i : i + length]
+            rest = order[:i] + order[i + length :]
+
+            for position in range(1, len(rest)):
+                if position == i:
+                    continue
+                if time.monotonic() > deadline:
+                    return False
+
+                candidate = rest[:position] + segment + rest[position:]
+                cost = path_cost(matrix, candidate)
+                if cost < best - 1e-9:
+                    order[:] = candidate
+                    return True
+    return False
+
+
+def optimize_visit_order(matrix, time_limit: float):
+    """
+    Порядок відвідування проміжних точок для шляху з фіксованими початком
+    (індекс 0) і кінцем (n-1): nearest insertion, далі 2-opt та Or-opt,
+    поки є покращення або не вичерпано time_limit секунд.
+
+    Недосяжні пари (inf) замінюються великим штрафом, щоб порівняння
+    залишалися коректними.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    finite = np.isfinite(matrix)
+    penalty = (matrix[finite].max() if finite.any() else 1.0) * len(matrix) + 1
+    matrix = np.where(finite, matrix, penalty)
+
+    if len(matrix) <= 3:
+        return list(range(len(matrix)))
+
+    deadline = time.monotonic() + time_limit
+    order = nearest_insertion(matrix)
+
+    while time.monotonic() < deadline:
+        if _two_opt_pass(matrix, order, deadline):
+            continue
+        if not _or_opt_pass(matrix, order, deadline):
+            break
+
+    return order
@@ -1,16 +1,15 @@
+import hashlib
 import os
 import pickle
 
 import matplotlib.pyplot as plt
-import networkx as nx
 import numpy as np
 import osmnx as ox
+import shapely
 from matplotlib.patches import Polygon as MplPolygon
-from shapely.geometry import LineString, Point, Polygon
-from sqlmodel import Session
+from shapely.geometry import Polygon
 
-from config.database import engine
-from utils.db_utils import find_nearest_settlement
+from utils.settlement_index import sample_along
 
 
 def load_graph(pkl_file, custom_filter):
@@ -34,36 +33,23 @@ def load_graph(pkl_file, custom_filter):
     return G
 
 
-def extract_edge_geometries(G, path):
-    edge_lines = []
-
-    for u, v in zip(path[:-1], path[1:]):
-        data = G.get_edge_data(u, v)
-
-        # Если несколько рёбер между u и v
-        if isinstance(data, dict):
-            edge_data = data[list(data.keys())[0]]
-        else:
-            edge_data = data
+def graph_version(G) -> str:
+    """Ідентифікатор поточної збірки графа (для ключів кешів)"""
+    fingerprint = (
+        f"{G.graph.get('created_date', '')}:"
+        f"{G.number_of_nodes()}:{G.number_of_edges()}"
+    )
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
 
-        # Если есть геометрия ребра — используем её
-        if "geometry" in edge_data:
-            line = edge_data["geometry"]
-            edge_lines.append(line)
-        else:
-            # Иначе просто соединяем две точки прямой
-            point_u = (G.nodes[u]["x"], G.nodes[u]["y"])
-            point_v = (G.nodes[v]["x"], G.nodes[v]["y"])
-            line = LineString([point_u, point_v])
-            edge_lines.append(line)
 
-    # Объединяем все линии в одну последовательность координат
-    coords = []
-    for line in edge_lines:
-        coords.extend(list(line.coords))
+def add_travel_times(G):
+    """Додає ребрам speed_kph і travel_time (с), якщо граф їх ще не має"""
+    if any("travel_time" in data for _, _, data in G.edges(data=True)):
+        return
 
-    # Убедимся, что это формат [lat, lng], а не [lng, lat]
-    return [(lat, lon) for lon, lat in coords]
+    print("Adding edge speeds and travel times...")
+    ox.add_edge_speeds(G)
+    ox.add_edge_travel_times(G)
 
 
 def plot_shortest_path(
@@ -158,75 +144,87 @@ def plot_shortest_path(
     plt.show()
 
 
-def filter_threats(G, threats):
-    G = G.copy()
-
-    polygons = [Polygon([(lng, lat) for lat, lng in threat]) for threat in threats]
-
-    nodes_to_remove = []
+def threat_mask(compact_graph, threats):
+    """
+    Маска вузлів компактного графа, що лежать у зонах загроз (None без загроз).
+    Граф не копіюється: пошук просто оминає ці вузли.
+    """
+    if not threats:
+        return None
 
-    for node, data in G.nodes(data=True):
-        point = Point(data["x"], data["y"])  # x = lon, y = lat
+    inside = np.zeros(compact_graph.num_nodes, dtype=bool)
 
-        # Проверим, находится ли узел внутри хотя бы одного полигона
-        if any(polygon.contains(point) for polygon in polygons):
-            nodes_to_remove.append(node)
+    for threat in threats:
+        polygon = Polygon([(lng, lat) for lat, lng in threat])
+        shapely.prepare(polygon)
+        inside |= shapely.contains_xy(polygon, compact_graph.xs, compact_graph.ys)
 
-    print(f"Deleting {len(nodes_to_remove)} nodes")
-    G.remove_nodes_from(nodes_to_remove)
+    print(f"Blocking {int(inside.sum())} nodes")
+    return inside
 
-    return G
-
-
-def alt_heuristic(u, v, landmarks, landmark_distances):
-    estimates = []
-    for landmark in landmarks:
-        dist_u = landmark_distances[landmark].get(u, 0)
-        dist_v = landmark_distances[landmark].get(v, 0)
-        estimates.append(abs(dist_u - dist_v))
-    return max(estimates) if estimates else 0
 
+def snap_points(compact_graph, points, blocked_mask=None):
+    """Найближчі до точок [lat, lon] вузли графа (osm id) поза зонами загроз"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    indices = compact_graph.nearest_nodes(points[:, 0], points[:, 1], blocked_mask)
+    return compact_graph.node_ids[indices].tolist()
 
-async def get_settlements_along_route(G, route_nodes, sample_interval=10):
-    """Extracts settlements names along route"""
-    print("Extracting settlements along route from DB...")
-
-    settlements = []
-    current_settlement = None
 
-    # берем часть узлов (не все)
-    sampled_nodes = [
-        route_nodes[i] for i in range(0, len(route_nodes), sample_interval)
+def get_settlements_along_route(
+    compact_graph,
+    route_nodes,
+    node_settlements,
+    settlement_index,
+    spacing_m=500,
+    radius_km=10,
+):
+    """
+    Extracts settlements names along route.
+
+    Єдине джерело — таблиця вузол -> пункт, обчислена при збірці графа.
+    Лише ребра, довші за spacing_m, доповнюються точками своєї геометрії
+    через кожні spacing_m метрів (один запит до індексу пунктів), щоб не
+    пропустити пункт посеред довгого ребра. Серії однакових назв у
+    підсумковій послідовності стискаються.
+    """
+    indices = compact_graph.node_indices(route_nodes)
+    names = [
+        node_settlements.names[i] if i >= 0 else None
+        for i in node_settlements.table[indices].tolist()
     ]
 
-    with Session(engine) as session:
-        for node in sampled_nodes:
-            lat = G.nodes[node]["y"]
-            lon = G.nodes[node]["x"]
-
-            settlement_name = find_nearest_settlement(session, lat, lon)
+    edges = compact_graph.edge_ids_between(indices[:-1], indices[1:])
+    long_edges = np.flatnonzero(compact_graph.lengths[edges] > spacing_m).tolist()
+
+    # Внутрішні точки довгих ребер (без кінців — це вузли з таблиці)
+    samples = []
+    owners = []
+    for position in long_edges:
+        edge = edges[position]
+        geometry = compact_graph.geom_coords[
+            compact_graph.geom_offsets[edge] : compact_graph.geom_offsets[edge + 1]
+        ]
+        points = sample_along(geometry, spacing_m)[0][1:-1]
+        samples.append(points)
+        owners += [position] * len(points)
+
+    sample_names = []
+    if owners:
+        points = np.concatenate(samples)
+        sample_names = settlement_index.nearest(points[:, 0], points[:, 1], radius_km)
+
+    # Вузол ребра, далі точки цього ребра в порядку вздовж нього
+    sequence = []
+    sample = 0
+    for position, name in enumerate(names):
+        sequence.append(name)
+        while sample < len(owners) and owners[sample] == position:
+            sequence.append(sample_names[sample])
+            sample += 1
 
-            if settlement_name and settlement_name != current_settlement:
-                settlements.append(settlement_name)
-                current_settlement = settlement_name
+    settlements = []
+    for settlement_name in sequence:
+        if settlement_name and (not settlements or settlement_name != settlements[-1]):
+            settlements.append(settlement_name)
 
     return settlements
-
-
-def build_route_file_content(route_coords, settlements, total_distance) -> str:
-    """Генерирует содержимое файла маршрута в виде строки."""
-    content = "Інформація про маршрут\n"
-    content += f"Відстань: {round(total_distance / 1000, 2)} км\n\n"
-
-    content += "Точки маршруту:\n"
-    if settlements:
-        for i, settlement in enumerate(settlements, 1):
-            content += f"{i}. {settlement}\n"
-    else:
-        content += "Немає інформації про міста\n"
-
-    # content += "\nКоординати точок маршруту:\n"
-    # for i, coord in enumerate(route_coords, 1):
-    #     content += f"{i}. [{coord[1]}, {coord[0]}]\n"
-
-    return content